@@ -6,6 +6,7 @@ and the .env file.
 """
 
 import os
+import functools
 from dotenv import load_dotenv
 from typing import Dict, Any
 
@@ -18,25 +19,82 @@ TTS_API_ENDPOINT = os.getenv("TTS_API_ENDPOINT", "http://0.0.0.0:5005/v1/audio/s
 
 # Whisper Model Configuration
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "tiny.en")
+# Leave unset to auto-select: float16 on CUDA, int8 on CPU. The accuracy
+# cost of both is negligible for the base/small English models.
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE") or None
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE") or None
 
 # TTS Configuration
 TTS_MODEL = os.getenv("TTS_MODEL", "tts-1")
 TTS_VOICE = os.getenv("TTS_VOICE", "tara")
 TTS_FORMAT = os.getenv("TTS_FORMAT", "wav")
+TTS_SAMPLE_RATE = int(os.getenv("TTS_SAMPLE_RATE", 24000))
+# Duration of each audio chunk streamed to the client; 100-200ms lets
+# playback start early without flooding the socket with tiny frames
+TTS_CHUNK_MS = int(os.getenv("TTS_CHUNK_MS", 100))
+# The first few chunks are shorter so playback starts sooner
+TTS_INITIAL_CHUNK_MS = int(os.getenv("TTS_INITIAL_CHUNK_MS", 20))
+TTS_RAMP_CHUNKS = int(os.getenv("TTS_RAMP_CHUNKS", 3))
+# Optional hints forwarded to TTS servers that support them (unset = not sent)
+TTS_OPTIMIZE_STREAMING_LATENCY = int(os.getenv("TTS_OPTIMIZE_STREAMING_LATENCY")) if os.getenv("TTS_OPTIMIZE_STREAMING_LATENCY") else None
+TTS_LANGUAGE = os.getenv("TTS_LANGUAGE") or None
+TTS_SERVER_CHUNK_MS = int(os.getenv("TTS_SERVER_CHUNK_MS")) if os.getenv("TTS_SERVER_CHUNK_MS") else None
+# Memory budget for synthesized audio reused on repeated phrases (0 disables)
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+# "opus" stores cached speech compressed (lossy, ~20x smaller); requires the
+# optional opuslib package and TTS_RAW_PCM, otherwise PCM is cached as-is
+TTS_CACHE_CODEC = os.getenv("TTS_CACHE_CODEC", "pcm").lower()
+TTS_CACHE_OPUS_BITRATE = int(os.getenv("TTS_CACHE_OPUS_BITRATE", 24000))
+# Optional directory where cached TTS audio is also kept across restarts
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR") or None
+TTS_CACHE_DISK_MAX_BYTES = int(os.getenv("TTS_CACHE_DISK_MAX_BYTES", 500 * 1024 * 1024))
+# Stream TTS audio to the client as bare 16-bit PCM rather than a small WAV
+# file per chunk; the sample rate is announced once in tts_start
+TTS_RAW_PCM = os.getenv("TTS_RAW_PCM", "true").lower() == "true"
+
+# Concurrency limits for in-flight requests to the LLM and TTS servers
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", 3))
+
+# Response cache for repeated phrases. Cached turns ignore conversation
+# history, so it is off unless explicitly enabled.
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 256))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 3600))
+# Reuse a cached response for a reworded transcript when the sentence
+# embeddings are at least this similar (0 disables; ~0.92 is a cautious value)
+RESPONSE_CACHE_SEMANTIC_THRESHOLD = float(os.getenv("RESPONSE_CACHE_SEMANTIC_THRESHOLD", 0))
+RESPONSE_CACHE_EMBEDDING_MODEL = os.getenv("RESPONSE_CACHE_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 
 # WebSocket Server Configuration
 WEBSOCKET_HOST = os.getenv("WEBSOCKET_HOST", "0.0.0.0")
 WEBSOCKET_PORT = int(os.getenv("WEBSOCKET_PORT", 8000))
+# Protocol-level ping frames keep idle connections alive and detect dead
+# clients; a peer that misses a pong for WS_PING_TIMEOUT seconds is dropped
+WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", 20))
+WS_PING_TIMEOUT = float(os.getenv("WS_PING_TIMEOUT", 20))
+
+# Number of server worker processes. Each worker runs its own lifespan, so
+# the Whisper and vision models are loaded once per worker.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
 
 # Audio Processing
 VAD_THRESHOLD = float(os.getenv("VAD_THRESHOLD", 0.5))
 VAD_BUFFER_SIZE = int(os.getenv("VAD_BUFFER_SIZE", 30))
 AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", 48000))
+# Segments quieter (mean absolute amplitude) or shorter than this are
+# dropped before transcription instead of running Whisper on silence
+SILENCE_THRESHOLD = float(os.getenv("SILENCE_THRESHOLD", 0.005))
+MIN_SPEECH_SAMPLES = int(os.getenv("MIN_SPEECH_SAMPLES", 1600))
 
+@functools.lru_cache(maxsize=1)
 def get_config() -> Dict[str, Any]:
     """
     Returns all configuration settings as a dictionary.
     
+    Settings are read from the environment once at import time, so the
+    dictionary is built once and shared; callers must not modify it.
+    
     Returns:
         Dict[str, Any]: Dictionary containing all configuration settings
     """
@@ -44,12 +102,39 @@ def get_config() -> Dict[str, Any]:
         "llm_api_endpoint": LLM_API_ENDPOINT,
         "tts_api_endpoint": TTS_API_ENDPOINT,
         "whisper_model": WHISPER_MODEL,
+        "whisper_device": WHISPER_DEVICE,
+        "whisper_compute_type": WHISPER_COMPUTE_TYPE,
         "tts_model": TTS_MODEL,
         "tts_voice": TTS_VOICE,
         "tts_format": TTS_FORMAT,
+        "tts_sample_rate": TTS_SAMPLE_RATE,
+        "tts_chunk_ms": TTS_CHUNK_MS,
+        "tts_initial_chunk_ms": TTS_INITIAL_CHUNK_MS,
+        "tts_ramp_chunks": TTS_RAMP_CHUNKS,
+        "tts_optimize_streaming_latency": TTS_OPTIMIZE_STREAMING_LATENCY,
+        "tts_language": TTS_LANGUAGE,
+        "tts_server_chunk_ms": TTS_SERVER_CHUNK_MS,
+        "tts_cache_max_bytes": TTS_CACHE_MAX_BYTES,
+        "tts_cache_codec": TTS_CACHE_CODEC,
+        "tts_cache_opus_bitrate": TTS_CACHE_OPUS_BITRATE,
+        "tts_cache_dir": TTS_CACHE_DIR,
+        "tts_cache_disk_max_bytes": TTS_CACHE_DISK_MAX_BYTES,
+        "tts_raw_pcm": TTS_RAW_PCM,
+        "llm_max_concurrency": LLM_MAX_CONCURRENCY,
+        "tts_max_concurrency": TTS_MAX_CONCURRENCY,
+        "response_cache_enabled": RESPONSE_CACHE_ENABLED,
+        "response_cache_size": RESPONSE_CACHE_SIZE,
+        "response_cache_ttl": RESPONSE_CACHE_TTL,
+        "response_cache_semantic_threshold": RESPONSE_CACHE_SEMANTIC_THRESHOLD,
+        "response_cache_embedding_model": RESPONSE_CACHE_EMBEDDING_MODEL,
         "websocket_host": WEBSOCKET_HOST,
         "websocket_port": WEBSOCKET_PORT,
+        "ws_ping_interval": WS_PING_INTERVAL,
+        "ws_ping_timeout": WS_PING_TIMEOUT,
+        "web_concurrency": WEB_CONCURRENCY,
         "vad_threshold": VAD_THRESHOLD,
         "vad_buffer_size": VAD_BUFFER_SIZE,
         "audio_sample_rate": AUDIO_SAMPLE_RATE,
+        "silence_threshold": SILENCE_THRESHOLD,
+        "min_speech_samples": MIN_SPEECH_SAMPLES,
     }
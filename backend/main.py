@@ -5,10 +5,17 @@ FastAPI application entry point.
 """
 
 import logging
+import asyncio
+import hashlib
+import orjson
+import numpy as np
+import aiohttp
 import uvicorn
-from fastapi import FastAPI, WebSocket, Depends, HTTPException
+from fastapi import FastAPI, WebSocket, Depends, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Tuple
 
 # Import configuration
 from . import config
@@ -17,6 +24,7 @@ from . import config
 from .services.transcription import WhisperTranscriber
 from .services.llm import LLMClient
 from .services.tts import TTSClient
+from .services.response_cache import ResponseCache
 from .services.vision import vision_service
 
 # Import routes
@@ -29,60 +37,162 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global service instances
-transcription_service = None
-llm_service = None
-tts_service = None
-# Vision service is a singleton already initialized in its module
+# Configuration is static for the lifetime of the process
+CFG = config.get_config()
+
+async def warm_up_services(services: SimpleNamespace):
+    """
+    Run a dummy transcription and synthesis so the first real request
+    doesn't pay for model graph building, CUDA kernel selection or the
+    TTS server's cold start.
+    
+    Args:
+        services: The application's service instances
+    """
+    try:
+        silence = np.zeros(16000, dtype=np.float32)
+        await asyncio.to_thread(services.stt.transcribe, silence)
+        logger.info("Transcription service warmed up")
+    except Exception as e:
+        logger.warning(f"Transcription warm-up failed: {e}")
+    
+    try:
+        await services.tts.async_text_to_speech("warmup")
+        logger.info("TTS service warmed up")
+    except Exception as e:
+        logger.warning(f"TTS warm-up failed: {e}")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Startup and shutdown events for the FastAPI application.
-    """
-    # Load configuration
-    cfg = config.get_config()
     
+    Services are built here, exactly once per worker process, and stored on
+    app.state.services. Nothing is loaded at import time, so importing the
+    module (e.g. in the uvicorn supervisor) doesn't allocate model memory.
+    """
     # Initialize services on startup
     logger.info("Initializing services...")
     
-    global transcription_service, llm_service, tts_service
-    
     # Initialize transcription service
     transcription_service = WhisperTranscriber(
-        model_size=cfg["whisper_model"],
-        sample_rate=cfg["audio_sample_rate"]
+        model_size=CFG["whisper_model"],
+        device=CFG["whisper_device"],
+        compute_type=CFG["whisper_compute_type"],
+        sample_rate=CFG["audio_sample_rate"]
+    )
+    
+    # One keep-alive HTTP session shared by the LLM and TTS clients, so turns
+    # reuse open connections instead of reconnecting on every request
+    http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60),
+        timeout=aiohttp.ClientTimeout(total=None, connect=5)
     )
     
     # Initialize LLM service
     llm_service = LLMClient(
-        api_endpoint=cfg["llm_api_endpoint"]
+        api_endpoint=CFG["llm_api_endpoint"],
+        max_concurrency=CFG["llm_max_concurrency"],
+        session=http_session
     )
     
     # Initialize TTS service
     tts_service = TTSClient(
-        api_endpoint=cfg["tts_api_endpoint"],
-        model=cfg["tts_model"],
-        voice=cfg["tts_voice"],
-        output_format=cfg["tts_format"]
+        api_endpoint=CFG["tts_api_endpoint"],
+        model=CFG["tts_model"],
+        voice=CFG["tts_voice"],
+        output_format=CFG["tts_format"],
+        max_concurrency=CFG["tts_max_concurrency"],
+        session=http_session,
+        sample_rate=CFG["tts_sample_rate"],
+        chunk_ms=CFG["tts_chunk_ms"],
+        cache_max_bytes=CFG["tts_cache_max_bytes"],
+        cache_codec=CFG["tts_cache_codec"],
+        cache_opus_bitrate=CFG["tts_cache_opus_bitrate"],
+        cache_dir=CFG["tts_cache_dir"],
+        cache_disk_max_bytes=CFG["tts_cache_disk_max_bytes"],
+        raw_pcm=CFG["tts_raw_pcm"],
+        initial_chunk_ms=CFG["tts_initial_chunk_ms"],
+        ramp_chunks=CFG["tts_ramp_chunks"],
+        optimize_streaming_latency=CFG["tts_optimize_streaming_latency"],
+        language=CFG["tts_language"],
+        server_chunk_ms=CFG["tts_server_chunk_ms"]
     )
+    tts_service.start()
     
-    # Initialize vision service (will download model if not cached)
+    # Initialize response cache (shared by all connections)
+    response_cache = None
+    if CFG["response_cache_enabled"]:
+        response_cache = ResponseCache(
+            maxsize=CFG["response_cache_size"],
+            ttl=CFG["response_cache_ttl"],
+            semantic_threshold=CFG["response_cache_semantic_threshold"],
+            embedding_model=CFG["response_cache_embedding_model"]
+        )
+    
+    # Vision service is a singleton already created in its module
+    # (initialization will download the model if not cached)
     logger.info("Initializing vision service...")
     vision_service.initialize()
     
+    services = SimpleNamespace(
+        stt=transcription_service,
+        llm=llm_service,
+        tts=tts_service,
+        response_cache=response_cache,
+        http_session=http_session
+    )
+    app.state.services = services
+    
+    # Move one-off compile and connection costs out of the first user turn
+    logger.info("Warming up services...")
+    await warm_up_services(services)
+    
     logger.info("All services initialized successfully")
     
+    # Nothing in the health check depends on the request, so serialize it
+    # once; it is rebuilt only when vision readiness changes
+    app.state.health = _build_health(services, vision_service.is_ready())
+    
     yield
     
     # Cleanup on shutdown
     logger.info("Shutting down services...")
     
-    # No specific cleanup needed for these services,
-    # but we could add resource release code here if needed (maybe in a future release lex 31/03/25)
+    # Close pooled HTTP connections
+    await services.tts.close()
+    await services.http_session.close()
     
     logger.info("Shutdown complete")
 
+def _build_health(services: SimpleNamespace, vision_ready: bool) -> Tuple[bool, bytes, str]:
+    """
+    Serialize the health check response.
+    
+    Args:
+        services: The application's service instances
+        vision_ready: Whether the vision model is loaded
+        
+    Returns:
+        Tuple[bool, bytes, str]: The vision readiness the body reflects, the
+            JSON body and its ETag
+    """
+    body = orjson.dumps({
+        "status": "ok",
+        "services": {
+            "transcription": services.stt is not None,
+            "llm": services.llm is not None,
+            "tts": services.tts is not None,
+            "vision": vision_ready
+        },
+        "config": {
+            "whisper_model": CFG["whisper_model"],
+            "tts_voice": CFG["tts_voice"],
+            "websocket_port": CFG["websocket_port"]
+        }
+    })
+    return vision_ready, body, f'"{hashlib.sha1(body).hexdigest()}"'
+
 # Create FastAPI application
 app = FastAPI(
     title="Vocalis Backend",
@@ -101,14 +211,14 @@ app.add_middleware(
 )
 
 # Service dependency functions
-def get_transcription_service():
-    return transcription_service
+def get_transcription_service(request: Request):
+    return request.app.state.services.stt
 
-def get_llm_service():
-    return llm_service
+def get_llm_service(request: Request):
+    return request.app.state.services.llm
 
-def get_tts_service():
-    return tts_service
+def get_tts_service(request: Request):
+    return request.app.state.services.tts
 
 # API routes
 @app.get("/")
@@ -117,52 +227,61 @@ async def root():
     return {"status": "ok", "message": "Vocalis backend is running"}
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint."""
-    return {
-        "status": "ok",
-        "services": {
-            "transcription": transcription_service is not None,
-            "llm": llm_service is not None,
-            "tts": tts_service is not None,
-            "vision": vision_service.is_ready()
-        },
-        "config": {
-            "whisper_model": config.WHISPER_MODEL,
-            "tts_voice": config.TTS_VOICE,
-            "websocket_port": config.WEBSOCKET_PORT
-        }
-    }
+    state = request.app.state
+    vision_ready = vision_service.is_ready()
+    if state.health[0] != vision_ready:
+        state.health = _build_health(state.services, vision_ready)
+    
+    _, body, etag = state.health
+    headers = {"ETag": etag, "Cache-Control": "max-age=1"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.get("/config")
-async def get_full_config():
+async def get_full_config(request: Request):
     """Get full configuration."""
-    if not all([transcription_service, llm_service, tts_service]) or not vision_service.is_ready():
+    services = getattr(request.app.state, "services", None)
+    if services is None or not vision_service.is_ready():
         raise HTTPException(status_code=503, detail="Services not initialized")
     
     return {
-        "transcription": transcription_service.get_config(),
-        "llm": llm_service.get_config(),
-        "tts": tts_service.get_config(),
-        "system": config.get_config()
+        "transcription": services.stt.get_config(),
+        "llm": services.llm.get_config(),
+        "tts": services.tts.get_config(),
+        "response_cache": services.response_cache.get_config() if services.response_cache else None,
+        "system": CFG
     }
 
 # WebSocket route
 @app.websocket("/ws")
 async def websocket_route(websocket: WebSocket):
     """WebSocket endpoint for bidirectional audio streaming."""
+    services = websocket.app.state.services
     await websocket_endpoint(
         websocket, 
-        transcription_service, 
-        llm_service, 
-        tts_service
+        services.stt, 
+        services.llm, 
+        services.tts,
+        services.response_cache
     )
 
 # Run server directly if executed as script
 if __name__ == "__main__":
+    # "auto" picks uvloop and httptools when installed (not available on
+    # Windows) and falls back to the stdlib asyncio loop and h11 otherwise
     uvicorn.run(
         "backend.main:app",
         host=config.WEBSOCKET_HOST,
         port=config.WEBSOCKET_PORT,
-        reload=True
+        workers=config.WEB_CONCURRENCY,
+        loop="auto",
+        http="auto",
+        ws="websockets",
+        ws_ping_interval=config.WS_PING_INTERVAL,
+        ws_ping_timeout=config.WS_PING_TIMEOUT,
+        reload=False,
+        log_level="info"
     )
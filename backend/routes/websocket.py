@@ -7,31 +7,207 @@ Handles WebSocket connections for bidirectional audio streaming.
 import json
 import logging
 import asyncio
+import re
+import time
+import orjson
 import numpy as np
-import base64
+import binascii
 import os
-from typing import Dict, Any, List, Optional, AsyncGenerator
+import tempfile
+import struct
+from typing import Dict, Any, List, Optional, AsyncGenerator, Coroutine, NamedTuple, Set, Tuple, Union
 from fastapi import WebSocket, WebSocketDisconnect, BackgroundTasks
 from pydantic import BaseModel
-from datetime import datetime
 import soundfile as sf
 import io
 import wave
+from contextlib import aclosing
 
+from .. import config
 from ..services.transcription import WhisperTranscriber
-from ..services.llm import LLMClient
-from ..services.tts import TTSClient
+from ..services.llm import LLMClient, ErrorReply
+from ..services.tts import TTSClient, PrefetchedSpeech
+from ..services.response_cache import ResponseCache
 from ..services.conversation_storage import ConversationStorage
+from ..services.vision import vision_service
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application entrypoint (main.py)
 logger = logging.getLogger(__name__)
 
+# Streamed LLM text is flushed to TTS at the end of a sentence, or once the
+# buffer grows long enough that waiting for punctuation would stall playback
+SENTENCE_END_PATTERN = re.compile(r"[.?!]\s*$")
+MAX_SENTENCE_WORDS = 80
+
+# Bound on items waiting between pipeline stages (STT -> LLM -> TTS)
+PIPELINE_QUEUE_SIZE = 4
+
+# Sentences a connection may have in synthesis at once: the one streaming
+# and the next. Further sentences wait, leaving the shared TTS request slots
+# to other connections.
+TTS_PREFETCH_DEPTH = 2
+
+# Largest audio segment accepted from a client (~8 minutes of 16kHz mono
+# 16-bit PCM); larger payloads are rejected before anything is decoded
+MAX_AUDIO_BYTES = 16 * 1024 * 1024
+MAX_AUDIO_BASE64_CHARS = MAX_AUDIO_BYTES * 4 // 3 + 4
+
+# Bound on outbound frames waiting for a slow client (~6s of 100ms audio
+# chunks); once full, producers wait and status updates are dropped
+SEND_QUEUE_SIZE = 64
+
+# Name tagging the system message that carries the user's name
+USER_CONTEXT_NAME = "_user_context"
+
+# Appended to the user's question when it refers to an analyzed image
+VISION_CONTEXT_NOTE = " [Note: This question refers to the image I just analyzed.]"
+
+# Control items passed to the TTS stage alongside prefetched speech and
+# end-of-response markers: CacheResponse (sent just before the end marker) stores the
+# response that was just spoken, CachedSpeech replays a stored one
+class CacheResponse(NamedTuple):
+    transcript: str
+
+class CachedSpeech(NamedTuple):
+    audio_chunks: List[bytes]
+
+# Binary frame types: audio travels as binary WebSocket frames with a 4-byte
+# header (type tag + 3 reserved bytes) instead of base64 inside JSON. Tags
+# must stay below ord("{"), which marks a binary frame holding a JSON message.
+class FrameType:
+    TRANSCRIPT = 0
+    LLM_TEXT = 1
+    AUDIO = 2
+
+FRAME_HEADER_SIZE = 4
+AUDIO_FRAME_HEADER = bytes([FrameType.AUDIO, 0, 0, 0])
+
+# Outbound timestamps only need to be as fine as this (seconds); streaming
+# sends many messages within one interval, which then share one string
+TIMESTAMP_RESOLUTION = 0.01
+ISO_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+_timestamp_cache = ("", float("-inf"))
+
+def _now_iso() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string for outbound messages.
+    
+    Returns:
+        str: Timestamp such as "2024-01-01T12:00:00.000Z", cached per interval
+    """
+    global _timestamp_cache
+    now = time.monotonic()
+    if now - _timestamp_cache[1] >= TIMESTAMP_RESOLUTION:
+        wall = time.time()
+        millis = int(wall % 1 * 1000)
+        timestamp = f"{time.strftime(ISO_TIME_FORMAT, time.gmtime(wall))}.{millis:03d}Z"
+        _timestamp_cache = (timestamp, now)
+    return _timestamp_cache[0]
+
+def find_wav_pcm(audio_data) -> Optional[Tuple[int, int]]:
+    """
+    Locate the samples of a mono 16-bit PCM WAV file.
+    
+    Walks the RIFF chunk list instead of assuming a 44-byte header, since
+    encoders may add chunks (e.g. LIST) before the audio data.
+    
+    Args:
+        audio_data: WAV file bytes (or a memoryview of them)
+        
+    Returns:
+        Optional[Tuple[int, int]]: Byte offset and length of the sample data,
+            or None if this isn't a mono 16-bit PCM WAV file
+    """
+    if len(audio_data) < 12 or audio_data[8:12] != b"WAVE":
+        return None
+    
+    is_pcm16_mono = False
+    pos = 12
+    while pos + 8 <= len(audio_data):
+        chunk_id = audio_data[pos:pos + 4]
+        (chunk_size,) = struct.unpack_from("<I", audio_data, pos + 4)
+        
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            audio_format, channels = struct.unpack_from("<HH", audio_data, pos + 8)
+            (bits_per_sample,) = struct.unpack_from("<H", audio_data, pos + 22)
+            is_pcm16_mono = audio_format == 1 and channels == 1 and bits_per_sample == 16
+        elif chunk_id == b"data":
+            if not is_pcm16_mono:
+                return None
+            offset = pos + 8
+            # Streaming encoders may leave the size unset; clamp to what arrived
+            size = min(chunk_size, len(audio_data) - offset)
+            return offset, size - size % 2
+        
+        # Chunks are padded to an even length
+        pos += 8 + chunk_size + (chunk_size & 1)
+    
+    return None
+
+def decode_pcm(audio_data) -> np.ndarray:
+    """
+    Decode 16-bit PCM audio into float32 samples in [-1.0, 1.0).
+    
+    Args:
+        audio_data: WAV or raw PCM bytes (or a memoryview of them), or a base64 string
+        
+    Returns:
+        np.ndarray: Audio samples as float32
+    """
+    if isinstance(audio_data, str):
+        # Legacy JSON audio message; binascii skips base64's extra
+        # validation layers and decodes the str in a single pass
+        audio_data = binascii.a2b_base64(audio_data)
+    if audio_data[:4] == b"RIFF":
+        pcm = find_wav_pcm(audio_data)
+        if pcm is None:
+            # Other WAV encodings: let soundfile parse and convert them
+            samples, _ = sf.read(io.BytesIO(audio_data), dtype="float32")
+            return samples
+        
+        # View the sample region in place, skipping the header without a copy
+        offset, size = pcm
+        return np.frombuffer(audio_data, dtype=np.int16, count=size // 2, offset=offset).astype(np.float32) * (1.0 / 32768.0)
+    return np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) * (1.0 / 32768.0)
+
+def is_silent(audio: np.ndarray) -> bool:
+    """
+    Cheap check for segments not worth transcribing.
+    
+    Args:
+        audio: Audio samples as float32 in [-1.0, 1.0)
+        
+    Returns:
+        bool: True if the segment is too short or too quiet to contain speech
+    """
+    return audio.size < config.MIN_SPEECH_SAMPLES or np.abs(audio).mean() < config.SILENCE_THRESHOLD
+
+def write_file_atomic(path: str, content: str):
+    """
+    Write a text file so readers never see it partially written.
+    
+    The content goes to a temporary file in the same directory, which then
+    replaces the target in a single rename.
+    
+    Args:
+        path: Destination file path
+        content: Text to write
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
 # WebSocket message types
 class MessageType:
     AUDIO = "audio"
     TRANSCRIPTION = "transcription"
     LLM_RESPONSE = "llm_response"
+    LLM_TOKEN = "llm_token"
     TTS_CHUNK = "tts_chunk"
     TTS_START = "tts_start"
     TTS_END = "tts_end"
@@ -71,7 +247,8 @@ class WebSocketManager:
         self,
         transcriber: WhisperTranscriber,
         llm_client: LLMClient,
-        tts_client: TTSClient
+        tts_client: TTSClient,
+        response_cache: Optional[ResponseCache] = None
     ):
         """
         Initialize the WebSocket manager.
@@ -80,17 +257,33 @@ class WebSocketManager:
             transcriber: Whisper transcription service
             llm_client: LLM client service
             tts_client: TTS client service
+            response_cache: Shared cache of complete responses (disabled if None)
         """
         self.transcriber = transcriber
         self.llm_client = llm_client
         self.tts_client = tts_client
+        self.response_cache = response_cache
         
         # State tracking
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
         self.is_processing = False
+        # Set while TTS audio is being streamed to this client
+        self.is_speaking = False
         self.speech_buffer = []
-        self.current_audio_task = None
         self.interrupt_playback = asyncio.Event()
+        
+        # Pipeline stages, each fed by a bounded queue and run as its own task
+        self.stt_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.llm_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.tts_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.prefetch_slots = asyncio.Semaphore(TTS_PREFETCH_DEPTH)
+        self.pipeline_tasks: List[asyncio.Task] = []
+        
+        # In-flight LLM / TTS work that an interrupt cancels immediately
+        self.interruptible_tasks: Set[asyncio.Task] = set()
+        
+        # Outbound frames, drained by a single sender task that owns the socket
+        self.send_queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
         self.current_vision_context = None  # Store the latest vision context
         
         # File paths
@@ -98,16 +291,59 @@ class WebSocketManager:
         self.profile_path = os.path.join("prompts", "user_profile.json")
         self.vision_settings_path = os.path.join("prompts", "vision_settings.json")
         
-        # Load system prompt, user profile, and vision settings
-        self.system_prompt = self._load_system_prompt()
-        self.user_profile = self._load_user_profile()
-        self.vision_settings = self._load_vision_settings()
+        # Create the settings directory once rather than before every read/write
+        try:
+            for path in {self.prompt_path, self.profile_path, self.vision_settings_path}:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+        except OSError as e:
+            logger.error(f"Error creating settings directory: {e}")
+        
+        # Client message handlers, keyed by message type
+        self._message_handlers = {
+            MessageType.AUDIO: self._on_audio,
+            MessageType.VISION_FILE_UPLOAD: self._on_vision_file_upload,
+            "interrupt": self._on_interrupt,
+            "clear_history": self._on_clear_history,
+            MessageType.GREETING: self._on_greeting,
+            MessageType.SILENT_FOLLOWUP: self._on_silent_followup,
+            "get_system_prompt": self._on_get_system_prompt,
+            "update_system_prompt": self._on_update_system_prompt,
+            "get_user_profile": self._on_get_user_profile,
+            "update_user_profile": self._on_update_user_profile,
+            "get_vision_settings": self._on_get_vision_settings,
+            "update_vision_settings": self._on_update_vision_settings,
+            
+            # Session management handlers
+            MessageType.SAVE_SESSION: self._on_save_session,
+            MessageType.LOAD_SESSION: self._on_load_session,
+            MessageType.LIST_SESSIONS: self._on_list_sessions,
+            MessageType.DELETE_SESSION: self._on_delete_session,
+            
+            "ping": self._on_ping,
+            "pong": self._on_pong,
+        }
+        
+        # System prompt, user profile, and vision settings are read from disk
+        # in connect(), off the event loop
+        self.system_prompt = ""
+        self.user_profile: Dict[str, Any] = {}
+        self.vision_settings: Dict[str, Any] = {}
+        self._prompt_cache: Dict[Any, str] = {}
         
         # Initialize conversation storage
         self.conversation_storage = ConversationStorage()
         
         logger.info("Initialized WebSocket Manager")
     
+    def _load_settings(self):
+        """
+        Load system prompt, user profile, and vision settings from disk.
+        """
+        self.system_prompt = self._load_system_prompt()
+        self.user_profile = self._load_user_profile()
+        self._rebuild_prompt_cache()
+        self.vision_settings = self._load_vision_settings()
+    
     def _load_system_prompt(self) -> str:
         """
         Load system prompt from file or use default if file doesn't exist.
@@ -130,9 +366,6 @@ class WebSocketManager:
         )
         
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(self.prompt_path), exist_ok=True)
-            
             # Read from file if it exists
             if os.path.exists(self.prompt_path):
                 with open(self.prompt_path, "r") as f:
@@ -141,8 +374,7 @@ class WebSocketManager:
                         return prompt
             
             # If file doesn't exist or is empty, write default prompt
-            with open(self.prompt_path, "w") as f:
-                f.write(default_prompt)
+            write_file_atomic(self.prompt_path, default_prompt)
             
             return default_prompt
             
@@ -157,17 +389,20 @@ class WebSocketManager:
         Args:
             websocket: The WebSocket connection
         """
+        # Blocking file reads go to a thread so other connections keep streaming
+        await asyncio.to_thread(self._load_settings)
+        
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
         
-        # Send initial status
+        # Send initial status (delivered once the sender starts in run())
         await self._send_status(websocket, "connected", {
             "transcription_active": self.transcriber.is_processing,
             "llm_active": self.llm_client.is_processing,
             "tts_active": self.tts_client.is_processing
         })
         
-        logger.info(f"Client connected. Active connections: {len(self.active_connections)}")
+        logger.info("Client connected. Active connections: %d", len(self.active_connections))
     
     def disconnect(self, websocket: WebSocket):
         """
@@ -176,9 +411,47 @@ class WebSocketManager:
         Args:
             websocket: The WebSocket connection
         """
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        logger.info(f"Client disconnected. Active connections: {len(self.active_connections)}")
+        self.active_connections.discard(websocket)
+        
+        logger.info("Client disconnected. Active connections: %d", len(self.active_connections))
+    
+    async def run(self, websocket: WebSocket, receive_loop: Coroutine):
+        """
+        Run the receive loop together with the sender and pipeline workers.
+        
+        The tasks live and die as a group: as soon as one of them finishes
+        or fails (normally the receive loop, on disconnect), the others are
+        cancelled and awaited before this returns, so no STT, LLM or TTS work
+        continues for a closed connection. This mirrors asyncio.TaskGroup,
+        which isn't available on Python 3.10.
+        
+        Args:
+            websocket: The WebSocket connection
+            receive_loop: Coroutine reading client messages until disconnect
+            
+        Raises:
+            Exception: Whatever ended the first task to finish (e.g. WebSocketDisconnect)
+        """
+        self.pipeline_tasks = [
+            asyncio.create_task(receive_loop),
+            asyncio.create_task(self._sender(websocket)),
+            asyncio.create_task(self._stt_worker(websocket)),
+            asyncio.create_task(self._llm_worker(websocket)),
+            asyncio.create_task(self._tts_worker(websocket)),
+        ]
+        
+        try:
+            done, _ = await asyncio.wait(self.pipeline_tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in self.pipeline_tasks:
+                task.cancel()
+            await asyncio.gather(*self.pipeline_tasks, return_exceptions=True)
+            self.pipeline_tasks = []
+            self._drop_queued_speech()
+        
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
     
     async def _send_status(self, websocket: WebSocket, status: str, data: Dict[str, Any]):
         """
@@ -189,12 +462,13 @@ class WebSocketManager:
             status: Status message
             data: Additional data
         """
-        await websocket.send_json({
+        # Status updates are advisory, so they never hold up the pipeline
+        await self._send_json(websocket, {
             "type": MessageType.STATUS,
             "status": status,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             "data": data
-        })
+        }, droppable=True)
     
     async def _send_error(self, websocket: WebSocket, error: str, details: Optional[Dict[str, Any]] = None):
         """
@@ -205,48 +479,98 @@ class WebSocketManager:
             error: Error message
             details: Additional error details
         """
-        await websocket.send_json({
+        await self._send_json(websocket, {
             "type": MessageType.ERROR,
             "error": error,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             "details": details or {}
         })
     
-    async def handle_audio(self, websocket: WebSocket, audio_data: bytes):
+    async def _send_json(self, websocket: WebSocket, payload: Dict[str, Any], droppable: bool = False):
+        """
+        Send a JSON message to a WebSocket client using orjson.
+        
+        Args:
+            websocket: The WebSocket connection
+            payload: Message to send
+            droppable: Drop the message instead of waiting if the send queue is full
+        """
+        frame = orjson.dumps(payload).decode("utf-8")
+        
+        if not droppable:
+            await self.send_queue.put(frame)
+            return
+        
+        try:
+            self.send_queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            logger.debug("Send queue full, dropped %s message", payload.get("type"))
+    
+    async def _send_bytes(self, frame: bytes):
+        """
+        Queue a binary frame for the sender task.
+        
+        Waits while the send queue is full, so a slow client throttles the
+        producer instead of frames piling up in memory.
+        
+        Args:
+            frame: Binary frame to send
+        """
+        await self.send_queue.put(frame)
+    
+    async def _sender(self, websocket: WebSocket):
+        """
+        Send queued frames to the client, in order.
+        
+        This is the only task that writes to the socket. Each send waits for
+        the transport to accept the frame, so the queue only drains as fast
+        as the client reads.
+        
+        Args:
+            websocket: The WebSocket connection
+        """
+        try:
+            while True:
+                frame = await self.send_queue.get()
+                if isinstance(frame, bytes):
+                    await websocket.send_bytes(frame)
+                else:
+                    await websocket.send_text(frame)
+        except Exception as e:
+            logger.error(f"Error sending to client: {e}")
+    
+    async def handle_audio(self, websocket: WebSocket, audio_data: Union[bytes, memoryview, str]):
         """
         Process incoming audio data from a WebSocket client.
         
         Args:
             websocket: The WebSocket connection
-            audio_data: Raw audio data
+            audio_data: Raw audio data, or base64-encoded audio from a JSON message
         """
         try:
-            # We're receiving WAV data, so we need to parse the WAV header
-            # WAV format: 44-byte header followed by PCM data
-            # Let whisper handle the WAV data directly - it can parse WAV headers
-            audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
-
-            if self.tts_client.is_processing:
+            if self.is_speaking:
                 logger.info("Ignoring microphone input during TTS playback")
                 return
             
-            # Interrupt any ongoing TTS playback
-            if self.tts_client.is_processing:
-                logger.info("Interrupting TTS playback due to new speech")
-                self.interrupt_playback.set()
-                
-                # Let any current processing finish before starting new
-                if self.current_audio_task and not self.current_audio_task.done():
-                    try:
-                        await self.current_audio_task
-                    except asyncio.CancelledError:
-                        logger.info("Previous audio task cancelled")
-            
-            # Process the audio segment in a background task
-            # Whisper will handle voice activity detection internally
-            self.current_audio_task = asyncio.create_task(
-                self._process_speech_segment(websocket, audio_array)
-            )
+            max_size = MAX_AUDIO_BASE64_CHARS if isinstance(audio_data, str) else MAX_AUDIO_BYTES
+            if len(audio_data) > max_size:
+                logger.warning("Rejecting oversized audio segment (%d bytes)", len(audio_data))
+                await self._send_error(websocket, "Audio segment too large")
+                return
+            
+            # We're receiving WAV data (16-bit PCM). Decode once, off the event
+            # loop; the float32 array is what every later stage works with.
+            audio_array = await asyncio.to_thread(decode_pcm, audio_data)
+            
+            # Whisper would only return an empty transcript for silence
+            if is_silent(audio_array):
+                logger.info("Skipping silent audio segment")
+                await self._send_empty_turn(websocket, "")
+                return
+            
+            # Hand the segment to the transcription stage; this applies
+            # backpressure when the pipeline is already full
+            await self.stt_queue.put(audio_array)
             
             # Send processing status update
             await self._send_status(websocket, "audio_processing", {
@@ -257,145 +581,459 @@ class WebSocketManager:
             logger.error(f"Error processing audio: {e}")
             await self._send_error(websocket, f"Audio processing error: {str(e)}")
     
-    async def _process_speech_segment(self, websocket: WebSocket, speech_audio: np.ndarray):
+    def _interrupt_pipeline(self):
+        """
+        Stop ongoing playback and drop any speech still waiting for synthesis.
+        
+        In-flight LLM streaming and speech synthesis are cancelled rather than
+        waited for, so a barge-in takes effect without waiting for the next
+        token or audio chunk.
+        """
+        self.interrupt_playback.set()
+        self._drop_queued_speech()
+        
+        # Keep the end-of-response marker so the TTS worker resets its state
+        self.tts_queue.put_nowait(None)
+        
+        for task in self.interruptible_tasks:
+            task.cancel()
+    
+    def _drop_queued_speech(self):
+        """
+        Empty the TTS queue, cancelling synthesis of the sentences in it.
+        """
+        while not self.tts_queue.empty():
+            item = self.tts_queue.get_nowait()
+            if isinstance(item, PrefetchedSpeech):
+                item.cancel()
+    
+    async def _run_interruptible(self, coro: Coroutine):
         """
-        Process a complete speech segment.
+        Run one unit of pipeline work as a task that an interrupt can cancel.
+        
+        Cancellation by _interrupt_pipeline ends only this unit of work; the
+        calling worker carries on with its next item.
         
         Args:
-            websocket: The WebSocket connection
-            speech_audio: Speech audio as numpy array
+            coro: The work to run
+            
+        Raises:
+            Exception: Whatever the work itself raised
         """
+        task = asyncio.create_task(coro)
+        self.interruptible_tasks.add(task)
         try:
-            # Set processing flag
-            self.is_processing = True
-            self.interrupt_playback.clear()
-            
-            # Transcribe speech
-            await self._send_status(websocket, "transcribing", {})
-            transcript, metadata = self.transcriber.transcribe(speech_audio)
-            
-            # Send transcription result
-            await websocket.send_json({
-                "type": MessageType.TRANSCRIPTION,
-                "text": transcript,
-                "metadata": metadata,
-                "timestamp": datetime.now().isoformat()
-            })
+            await asyncio.wait({task})
+        finally:
+            self.interruptible_tasks.discard(task)
+            # The worker itself is being cancelled; take the work down with it
+            if not task.done():
+                task.cancel()
+        
+        if task.cancelled():
+            logger.info("Pipeline work cancelled by interrupt")
+        else:
+            task.result()
+    
+    async def _stt_worker(self, websocket: WebSocket):
+        """
+        Pipeline stage: transcribe queued speech segments and pass the
+        resulting text on to the LLM stage.
+        
+        Args:
+            websocket: The WebSocket connection
+        """
+        while True:
+            speech_audio = await self.stt_queue.get()
             
-            # Skip LLM and TTS if transcription is empty
-            if not transcript.strip():
-                logger.info("Empty transcription, skipping LLM and TTS")
+            try:
+                # Set processing flag
+                self.is_processing = True
+                self.interrupt_playback.clear()
                 
-                # Notify frontend that transcription occurred (even if it's just "...") to let it reset
-                await websocket.send_json({
-                    "type": MessageType.TRANSCRIPTION,
-                    "text": transcript,
-                    "metadata": {},
-                    "timestamp": datetime.now().isoformat()
-                })
+                user_input = await self._process_speech_segment(websocket, speech_audio)
+                if user_input:
+                    await self.llm_queue.put(user_input)
+            except Exception as e:
+                logger.error(f"Error processing speech segment: {e}")
+                await self._send_error(websocket, f"Speech processing error: {str(e)}")
+            finally:
+                self.is_processing = False
+    
+    async def _process_speech_segment(self, websocket: WebSocket, speech_audio: np.ndarray) -> Optional[str]:
+        """
+        Transcribe a complete speech segment.
+        
+        Args:
+            websocket: The WebSocket connection
+            speech_audio: Speech audio as numpy array
+            
+        Returns:
+            Optional[str]: Text to send to the LLM, or None if nothing was said
+        """
+        # Transcribe speech
+        await self._send_status(websocket, "transcribing", {})
+        transcript, metadata = await self.transcriber.transcribe_async(speech_audio)
+        
+        # Send transcription result
+        await self._send_json(websocket, {
+            "type": MessageType.TRANSCRIPTION,
+            "text": transcript,
+            "metadata": metadata,
+            "timestamp": _now_iso()
+        })
+        
+        # Skip LLM and TTS if transcription is empty
+        if not transcript.strip():
+            logger.info("Empty transcription, skipping LLM and TTS")
+            await self._send_empty_turn(websocket, transcript)
+            return None
+            
+        # Check if we have recent vision context to incorporate
+        if self.current_vision_context is not None:
+            logger.info("Processing speech with vision context")
+            
+            # Add vision context to conversation history
+            self._add_vision_context_to_conversation(self.current_vision_context)
+            
+            # Clear vision context after use to avoid affecting future non-vision conversations
+            self.current_vision_context = None
+            logger.info("Vision context consumed")
+            
+            # Enhance user query with vision context reference
+            await self._send_status(websocket, "processing_llm", {"has_vision_context": True})
+            return f"{transcript}{VISION_CONTEXT_NOTE}"
+        
+        # Normal non-vision processing
+        await self._send_status(websocket, "processing_llm", {})
+        return transcript
+    
+    async def _send_empty_turn(self, websocket: WebSocket, transcript: str):
+        """
+        Let the frontend reset after a turn that produced no speech.
+        
+        Args:
+            websocket: The WebSocket connection
+            transcript: The (empty) transcript
+        """
+        # Notify frontend that transcription occurred (even if it's just "...") to let it reset
+        await self._send_json(websocket, {
+            "type": MessageType.TRANSCRIPTION,
+            "text": transcript,
+            "metadata": {},
+            "timestamp": _now_iso()
+        })
 
-                # Still send TTS_END to fully reset UI
-                await websocket.send_json({
-                    "type": MessageType.TTS_END,
-                    "timestamp": datetime.now().isoformat()
-                })
-                return
-                
-            # Check if we have recent vision context to incorporate
-            has_vision_context = self.current_vision_context is not None
+        # Still send TTS_END to fully reset UI
+        await self._send_json(websocket, {
+            "type": MessageType.TTS_END,
+            "timestamp": _now_iso()
+        })
+    
+    async def _llm_worker(self, websocket: WebSocket):
+        """
+        Pipeline stage: stream LLM responses for queued user input.
+        
+        Args:
+            websocket: The WebSocket connection
+        """
+        while True:
+            user_input = await self.llm_queue.get()
             
-            if has_vision_context:
-                logger.info("Processing speech with vision context")
+            try:
+                await self._run_interruptible(self._stream_response(websocket, user_input))
+            except Exception as e:
+                logger.error(f"Error streaming LLM response: {e}")
+                await self._send_error(websocket, f"LLM processing error: {str(e)}")
+    
+    async def _stream_response(self, websocket: WebSocket, user_input: str):
+        """
+        Stream the LLM response and queue it for synthesis sentence by sentence.
+        
+        Tokens are forwarded to the client as they arrive and complete sentences
+        are handed to the TTS stage, so speech synthesis overlaps with generation
+        instead of waiting for the full response.
+        
+        The LLM stream is read into a buffer by its own task, so waiting for
+        a TTS prefetch slot never holds the LLM connection (and its shared
+        request slot) open.
+        
+        Args:
+            websocket: The WebSocket connection
+            user_input: Text to send to the LLM
+        """
+        # Responses that depend on an image can't be reused
+        cacheable = self.response_cache is not None and not user_input.endswith(VISION_CONTEXT_NOTE)
+        
+        if cacheable:
+            cached = await self.response_cache.lookup(user_input)
+            if cached is not None:
+                await self._send_cached_response(websocket, user_input, *cached)
+                return
+        
+        buffer = ""
+        parts = []
+        failed = False
+        
+        # This loop runs once per generated token, so resolve the attribute
+        # lookups it needs up front
+        send_json = self._send_json
+        interrupted = self.interrupt_playback.is_set
+        token_type = MessageType.LLM_TOKEN
+        
+        # Unbounded: holds at most one reply; None marks the end of the stream
+        tokens: asyncio.Queue = asyncio.Queue()
+        
+        async def read_tokens():
+            try:
+                async with aclosing(self.llm_client.stream_response(user_input, self.system_prompt)) as stream:
+                    async for token in stream:
+                        tokens.put_nowait(token)
+            finally:
+                tokens.put_nowait(None)
+        
+        reader = asyncio.create_task(read_tokens())
+        
+        try:
+            while (token := await tokens.get()) is not None:
+                if interrupted():
+                    logger.info("LLM streaming interrupted")
+                    break
                 
-                # Add vision context to conversation history
-                self._add_vision_context_to_conversation(self.current_vision_context)
+                if isinstance(token, ErrorReply):
+                    failed = True
                 
-                # Enhance user query with vision context reference
-                enhanced_transcript = f"{transcript} [Note: This question refers to the image I just analyzed.]"
+                parts.append(token)
+                buffer += token
                 
-                # Get LLM response with vision-aware context
-                await self._send_status(websocket, "processing_llm", {"has_vision_context": True})
-                llm_response = self.llm_client.get_response(enhanced_transcript, self.system_prompt)
+                await send_json(websocket, {
+                    "type": token_type,
+                    "text": token,
+                    "timestamp": _now_iso()
+                })
                 
-                # Clear vision context after use to avoid affecting future non-vision conversations
-                # Only clear after successful processing
-                self.current_vision_context = None
-                logger.info("Vision context processed and cleared")
+                if SENTENCE_END_PATTERN.search(buffer) or len(buffer.split()) >= MAX_SENTENCE_WORDS:
+                    await self._queue_sentence(buffer)
+                    buffer = ""
             else:
-                # Normal non-vision processing
-                await self._send_status(websocket, "processing_llm", {})
-                llm_response = self.llm_client.get_response(transcript, self.system_prompt)
-            
-            # Send LLM response
-            await websocket.send_json({
-                "type": MessageType.LLM_RESPONSE,
-                "text": llm_response["text"],
-                "metadata": {k: v for k, v in llm_response.items() if k != "text"},
-                "timestamp": datetime.now().isoformat()
-            })
+                # Raise anything the reader failed with
+                await reader
             
-            # Generate and send TTS audio
-            await self._send_tts_response(websocket, llm_response["text"])
+            if not self.interrupt_playback.is_set():
+                await self._queue_sentence(buffer)
             
-        except Exception as e:
-            logger.error(f"Error processing speech segment: {e}")
-            await self._send_error(websocket, f"Speech processing error: {str(e)}")
+            # Interrupted responses and error replies must not be cached
+            if cacheable and not failed and not self.interrupt_playback.is_set():
+                await self.tts_queue.put(CacheResponse(user_input))
         finally:
-            self.is_processing = False
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+            
+            # End-of-response marker for the TTS stage
+            await self.tts_queue.put(None)
+        
+        # Send the complete LLM response once generation has finished
+        await self._send_json(websocket, {
+            "type": MessageType.LLM_RESPONSE,
+            "text": "".join(parts),
+            "metadata": {"streamed": True},
+            "timestamp": _now_iso()
+        })
     
-    async def _send_tts_response(self, websocket: WebSocket, text: str):
+    async def _send_cached_response(self, websocket: WebSocket, user_input: str,
+                                    text: str, audio_chunks: List[bytes]):
         """
-        Generate and send TTS audio.
+        Replay a cached response without calling the LLM or TTS services.
         
         Args:
             websocket: The WebSocket connection
+            user_input: The user's transcript
+            text: Cached response text
+            audio_chunks: Cached audio chunks for the response
+        """
+        logger.info("Serving response from cache")
+        
+        # Keep the conversation history consistent with what the user heard
+        self.llm_client.add_to_history("user", user_input)
+        self.llm_client.add_to_history("assistant", text)
+        
+        await self.tts_queue.put(CachedSpeech(audio_chunks))
+        await self.tts_queue.put(None)
+        
+        await self._send_json(websocket, {
+            "type": MessageType.LLM_RESPONSE,
+            "text": text,
+            "metadata": {"cached": True},
+            "timestamp": _now_iso()
+        })
+    
+    async def _queue_speech(self, text: str):
+        """
+        Queue a complete response for synthesis by the TTS stage.
+        
+        Args:
             text: Text to convert to speech
         """
         if not text.strip():
             logger.info("Empty text for TTS, skipping")
             return
         
+        await self._queue_sentence(text)
+        await self.tts_queue.put(None)
+    
+    async def _queue_sentence(self, text: str):
+        """
+        Start synthesizing a sentence and queue it for the TTS stage.
+        
+        Synthesis begins as soon as a prefetch slot is free, so while the
+        TTS worker streams one sentence the next is already being generated.
+        
+        Args:
+            text: Text to convert to speech
+        """
+        if not text.strip():
+            return
+        
+        await self.prefetch_slots.acquire()
+        speech = self.tts_client.prefetch(text)
+        speech.add_done_callback(self.prefetch_slots.release)
         try:
-            # Signal TTS start
-            await websocket.send_json({
-                "type": MessageType.TTS_START,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            await self._send_status(websocket, "generating_speech", {})
+            await self.tts_queue.put(speech)
+        except asyncio.CancelledError:
+            speech.cancel()
+            raise
+    
+    async def _tts_worker(self, websocket: WebSocket):
+        """
+        Pipeline stage: stream the audio of queued sentences in order.
+        
+        Each response is a run of PrefetchedSpeech items, whose synthesis
+        started when they were queued, terminated by None, which
+        brackets the audio with TTS_START / TTS_END messages. A response
+        may instead be a single CachedSpeech item, and a CacheResponse item
+        asks for the response that just ended to be stored in the cache.
+        
+        Args:
+            websocket: The WebSocket connection
+        """
+        started = False
+        # Text and audio of the current response, kept only if caching is on
+        recording = ([], []) if self.response_cache is not None else None
+        cache_transcript = None
+        failed = False
+        
+        while True:
+            item = await self.tts_queue.get()
             
-            # Stream audio chunks in real-time
-            async for audio_chunk in self.tts_client.stream_text_to_speech_async(text):
-                # Check if playback should be interrupted
+            try:
+                if item is None:
+                    # Signal TTS end
+                    if started and not self.interrupt_playback.is_set():
+                        await self._send_json(websocket, {
+                            "type": MessageType.TTS_END,
+                            "timestamp": _now_iso()
+                        })
+                        
+                        # Only complete, uninterrupted responses are cached
+                        if cache_transcript is not None and recording is not None and not failed:
+                            texts, audio_chunks = recording
+                            self.response_cache.put(cache_transcript, "".join(texts), audio_chunks)
+                    started = False
+                    self.is_speaking = False
+                    failed = False
+                    cache_transcript = None
+                    if recording is not None:
+                        recording = ([], [])
+                    continue
+                
+                if isinstance(item, CacheResponse):
+                    cache_transcript = item.transcript
+                    continue
+                
                 if self.interrupt_playback.is_set():
+                    if isinstance(item, PrefetchedSpeech):
+                        item.cancel()
+                    continue
+                
+                if isinstance(item, CachedSpeech):
+                    if not started:
+                        await self._send_tts_start(websocket)
+                        started = True
+                        self.is_speaking = True
+                    
+                    for audio_chunk in item.audio_chunks:
+                        if self.interrupt_playback.is_set():
+                            logger.info("Cached playback interrupted")
+                            break
+                        await self._send_bytes(AUDIO_FRAME_HEADER + audio_chunk)
+                    continue
+                
+                speech = item
+                if not started:
+                    # Signal TTS start on the first sentence of a response
+                    await self._send_tts_start(websocket)
+                    started = True
+                    self.is_speaking = True
+                
+                if recording is not None:
+                    recording[0].append(speech.text)
+                try:
+                    await self._run_interruptible(self._send_tts_response(
+                        websocket, speech, recording[1] if recording is not None else None))
+                finally:
+                    # Also frees the prefetch slot if streaming never started
+                    speech.cancel()
+            except Exception as e:
+                # A partially synthesized response must not be cached
+                failed = True
+                logger.error(f"Error streaming TTS: {e}")
+                await self._send_error(websocket, f"TTS streaming error: {str(e)}")
+    
+    async def _send_tts_start(self, websocket: WebSocket):
+        """
+        Signal the start of a spoken response.
+        
+        Args:
+            websocket: The WebSocket connection
+        """
+        # Describes the binary audio frames that follow
+        await self._send_json(websocket, {
+            "type": MessageType.TTS_START,
+            "format": self.tts_client.stream_format,
+            "sample_rate": self.tts_client.sample_rate,
+            "channels": 1,
+            "timestamp": _now_iso()
+        })
+        await self._send_status(websocket, "generating_speech", {})
+    
+    async def _send_tts_response(self, websocket: WebSocket, speech: PrefetchedSpeech,
+                                 recorded_chunks: Optional[List[bytes]] = None):
+        """
+        Send the TTS audio of a queued sentence.
+        
+        Args:
+            websocket: The WebSocket connection
+            speech: Sentence whose synthesis was started when it was queued
+            recorded_chunks: If given, audio chunks are also appended here
+        """
+        # Resolved once; the loop below runs for every audio chunk
+        send_bytes = self._send_bytes
+        interrupted = self.interrupt_playback.is_set
+        
+        # Stream audio chunks in real-time; chunks synthesized ahead of time
+        # are sent at once, the rest as they arrive
+        async with aclosing(speech.chunks()) as audio_chunks:
+            async for audio_chunk in audio_chunks:
+                # Check if playback should be interrupted
+                if interrupted():
                     logger.info("TTS streaming interrupted")
                     return
                 
-                # Encode and send each audio chunk immediately
-                # wav_buffer = io.BytesIO()
-                # sf.write(wav_buffer, audio_chunk, self.tts_client.sample_rate, format="WAV", subtype="PCM_16")
-                # wav_bytes = wav_buffer.getvalue()
-
-                # Encode and send each audio chunk immediately
-                encoded_audio = base64.b64encode(audio_chunk).decode("utf-8")
-                await websocket.send_json({
-                    "type": MessageType.TTS_CHUNK,
-                    "audio_chunk": encoded_audio,
-                    "format": self.tts_client.output_format,
-                    "timestamp": datetime.now().isoformat()
-                })
-
-            
-            # Signal TTS end
-            if not self.interrupt_playback.is_set():
-                await websocket.send_json({
-                    "type": MessageType.TTS_END,
-                    "timestamp": datetime.now().isoformat()
-                })
-            
-        except Exception as e:
-            logger.error(f"Error streaming TTS: {e}")
-            await self._send_error(websocket, f"TTS streaming error: {str(e)}")
+                if recorded_chunks is not None:
+                    recorded_chunks.append(audio_chunk)
+                
+                # Send each audio chunk immediately as a binary frame
+                await send_bytes(AUDIO_FRAME_HEADER + audio_chunk)
     
     def _load_user_profile(self) -> Dict[str, Any]:
         """
@@ -410,9 +1048,6 @@ class WebSocketManager:
         }
         
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(self.profile_path), exist_ok=True)
-            
             # Read from file if it exists
             if os.path.exists(self.profile_path):
                 with open(self.profile_path, "r") as f:
@@ -421,8 +1056,7 @@ class WebSocketManager:
                         return profile
             
             # If file doesn't exist or is empty, write default profile
-            with open(self.profile_path, "w") as f:
-                json.dump(default_profile, f, indent=2)
+            write_file_atomic(self.profile_path, json.dumps(default_profile, indent=2))
             
             return default_profile
             
@@ -438,9 +1072,7 @@ class WebSocketManager:
             bool: Whether the save was successful
         """
         try:
-            os.makedirs(os.path.dirname(self.profile_path), exist_ok=True)
-            with open(self.profile_path, "w") as f:
-                json.dump(self.user_profile, f, indent=2)
+            write_file_atomic(self.profile_path, json.dumps(self.user_profile, indent=2))
             return True
         except Exception as e:
             logger.error(f"Error saving user profile: {e}")
@@ -450,10 +1082,13 @@ class WebSocketManager:
         """Get the user's name from the profile, or empty string if not set."""
         return self.user_profile.get("name", "")
     
-    def _set_user_name(self, name: str) -> bool:
+    async def _set_user_name(self, name: str) -> bool:
         """
         Set the user's name in the profile.
         
+        The in-memory profile is updated right away; the file is written
+        from a worker thread.
+        
         Args:
             name: User name to set
             
@@ -461,7 +1096,27 @@ class WebSocketManager:
             bool: Whether the update was successful
         """
         self.user_profile["name"] = name
-        return self._save_user_profile()
+        self._rebuild_prompt_cache()
+        return await asyncio.to_thread(self._save_user_profile)
+    
+    def _rebuild_prompt_cache(self):
+        """
+        Precompute the greeting and follow-up prompts for the current user name.
+        
+        The prompts only change with the user profile, so this runs when the
+        profile is loaded or the name is updated.
+        """
+        user_name = self._get_user_name()
+        who = user_name if user_name else "someone"
+        
+        self._prompt_cache = {
+            ("greeting", True): f"Create a friendly greeting for {who} who just activated their microphone. Be brief and conversational, but treat it like you've met them before. Do not do anything else.",
+            ("greeting", False): f"Create a friendly greeting for {who} who just activated their microphone. Be brief and conversational, but treat it like you're meeting them for the first time. Do not do anything else.",
+        }
+        
+        # Adjust approach based on tier
+        for tier, approach in enumerate(("gentle check-in", "casual follow-up", "friendly reminder")):
+            self._prompt_cache[("followup", tier)] = f"Create a {approach} for {who} who hasn't responded to your last message. Be brief and conversational. Do not do anything else."
     
     def _get_greeting_prompt(self, is_returning_user: bool = False) -> str:
         """
@@ -473,18 +1128,7 @@ class WebSocketManager:
         Returns:
             str: The greeting prompt
         """
-        user_name = self._get_user_name()
-        
-        if user_name:
-            if is_returning_user:
-                return f"Create a friendly greeting for {user_name} who just activated their microphone. Be brief and conversational, but treat it like you've met them before. Do not do anything else."
-            else:
-                return f"Create a friendly greeting for {user_name} who just activated their microphone. Be brief and conversational, but treat it like you're meeting them for the first time. Do not do anything else."
-        else:
-            if is_returning_user:
-                return "Create a friendly greeting for someone who just activated their microphone. Be brief and conversational, but treat it like you've met them before. Do not do anything else."
-            else:
-                return "Create a friendly greeting for someone who just activated their microphone. Be brief and conversational, but treat it like you're meeting them for the first time. Do not do anything else."
+        return self._prompt_cache[("greeting", bool(is_returning_user))]
     
     def _get_followup_prompt(self, tier: int) -> str:
         """
@@ -496,21 +1140,8 @@ class WebSocketManager:
         Returns:
             str: The follow-up prompt
         """
-        user_name = self._get_user_name()
-        name_part = f" {user_name}" if user_name else ""
-        
-        # Adjust approach based on tier
-        if tier == 0:
-            approach = "gentle check-in"
-        elif tier == 1:
-            approach = "casual follow-up"
-        else:  # tier == 2
-            approach = "friendly reminder"
-        
-        if user_name:    
-            return f"Create a {approach} for {user_name} who hasn't responded to your last message. Be brief and conversational. Do not do anything else."
-        else:
-            return f"Create a {approach} for someone who hasn't responded to your last message. Be brief and conversational. Do not do anything else."
+        # Any tier other than 0 or 1 uses the last approach
+        return self._prompt_cache[("followup", tier if tier in (0, 1) else 2)]
 
     def _initialize_conversation_context(self):
         """
@@ -523,26 +1154,29 @@ class WebSocketManager:
             logger.info("No user name set, skipping context initialization")
             return False
             
-        logger.info(f"Initializing conversation context with user name: {user_name}")
+        logger.info("Initializing conversation context with user name: %s", user_name)
         
-        # Format the context message
+        # Format the context message; the name tags it so it can be found
+        # again without searching message content
         context_message = {
             "role": "system",
+            "name": USER_CONTEXT_NAME,
             "content": f"USER CONTEXT: The user's name is {user_name}."
         }
         
         # Check if we already have a system prompt as the first message
-        if self.llm_client.conversation_history and self.llm_client.conversation_history[0]["role"] == "system":
+        history = self.llm_client.conversation_history
+        if history and history[0]["role"] == "system":
             # Check if we already have a user context message
-            if len(self.llm_client.conversation_history) > 1 and "USER CONTEXT" in self.llm_client.conversation_history[1].get("content", ""):
+            if len(history) > 1 and history[1].get("name") == USER_CONTEXT_NAME:
                 # Replace existing context message
-                self.llm_client.conversation_history[1] = context_message
+                history[1] = context_message
             else:
                 # Insert after system prompt
-                self.llm_client.conversation_history.insert(1, context_message)
+                history.insert(1, context_message)
         else:
             # No system prompt, add context as first message
-            self.llm_client.conversation_history.insert(0, context_message)
+            history.insert(0, context_message)
             
         return True
 
@@ -554,40 +1188,45 @@ class WebSocketManager:
             # Check if user has conversation history
             has_history = len(self.llm_client.conversation_history) > 0
             
-            # Save current conversation history and temporarily clear it
-            saved_history = self.llm_client.conversation_history.copy()
-            self.llm_client.conversation_history = []
-            
             # Get customized greeting prompt
             instruction = self._get_greeting_prompt(is_returning_user=has_history)
             
-            # Get response from LLM without adding to conversation history, with moderate temperature
+            # Get response from LLM with an empty history and without adding to
+            # conversation history, with moderate temperature
             # Use instruction as user message, not as system message
             logger.info("Generating greeting")
-            llm_response = self.llm_client.get_response(instruction, self.system_prompt, add_to_history=False, temperature=0.7)
-            
-            # Restore saved conversation history
-            self.llm_client.conversation_history = saved_history
+            llm_response = await self.llm_client.get_response(
+                instruction, self.system_prompt, add_to_history=False, temperature=0.7, history=[])
             
             # Initialize conversation context with user information
             # This ensures the LLM knows the user's name in subsequent interactions
             self._initialize_conversation_context()
             
-            # Send LLM response
-            await websocket.send_json({
-                "type": MessageType.LLM_RESPONSE,
-                "text": llm_response["text"],
-                "metadata": {k: v for k, v in llm_response.items() if k != "text"},
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            # Generate and send TTS audio
-            await self._send_tts_response(websocket, llm_response["text"])
+            await self._respond(websocket, llm_response)
             
         except Exception as e:
             logger.error(f"Error generating greeting: {e}")
             await self._send_error(websocket, f"Greeting error: {str(e)}")
     
+    async def _respond(self, websocket: WebSocket, llm_response: Dict[str, Any]):
+        """
+        Send a complete (non-streamed) LLM response and queue it for speech.
+        
+        Args:
+            websocket: The WebSocket connection
+            llm_response: Response dict from LLMClient.get_response
+        """
+        # Send LLM response
+        await self._send_json(websocket, {
+            "type": MessageType.LLM_RESPONSE,
+            "text": llm_response["text"],
+            "metadata": {k: v for k, v in llm_response.items() if k != "text"},
+            "timestamp": _now_iso()
+        })
+        
+        # Queue the response for speech synthesis
+        await self._queue_speech(llm_response["text"])
+    
     async def _handle_silent_followup(self, websocket: WebSocket, tier: int):
         """
         Handle silent follow-up when user doesn't respond.
@@ -597,47 +1236,33 @@ class WebSocketManager:
             tier: Current follow-up tier (0-2)
         """
         try:
-            # Save full conversation history
-            full_history = self.llm_client.conversation_history.copy()
+            # Keep a reference to the full conversation history (no copy)
+            full_history = self.llm_client.conversation_history
             
             # Extract recent conversation context (keeping last few exchanges)
             context_messages = []
             
             # If there's a system message, keep it at the beginning
+            first = 0
             if full_history and full_history[0]["role"] == "system":
                 context_messages.append(full_history[0])
-                recent_history = full_history[1:]
-            else:
-                recent_history = full_history
+                first = 1
             
             # Include the last several exchanges for context (up to 6 messages)
             # This provides enough context for a meaningful continuation
-            num_context_messages = min(6, len(recent_history))
-            context_messages.extend(recent_history[-num_context_messages:])
-            
-            # Temporarily set conversation history to just these context messages
-            self.llm_client.conversation_history = context_messages
+            context_messages.extend(full_history[max(first, len(full_history) - 6):])
             
             # Select appropriate silence indicator based on tier
             user_input = "[silent]" if tier == 0 else "[no response]" if tier == 1 else "[still waiting]"
             
-            # Generate the follow-up with the silence indicator as user input
-            logger.info(f"Generating contextual follow-up (tier {tier+1})")
-            llm_response = self.llm_client.get_response(user_input, self.system_prompt, add_to_history=False, temperature=0.7)
-            
-            # Restore original conversation history
-            self.llm_client.conversation_history = full_history
-            
-            # Send LLM response
-            await websocket.send_json({
-                "type": MessageType.LLM_RESPONSE,
-                "text": llm_response["text"],
-                "metadata": {k: v for k, v in llm_response.items() if k != "text"},
-                "timestamp": datetime.now().isoformat()
-            })
+            # Generate the follow-up from just these context messages, with the
+            # silence indicator as user input
+            logger.info("Generating contextual follow-up (tier %d)", tier + 1)
+            llm_response = await self.llm_client.get_response(
+                user_input, self.system_prompt, add_to_history=False, temperature=0.7,
+                history=context_messages)
             
-            # Generate and send TTS audio
-            await self._send_tts_response(websocket, llm_response["text"])
+            await self._respond(websocket, llm_response)
             
         except Exception as e:
             logger.error(f"Error generating silent follow-up: {e}")
@@ -659,11 +1284,11 @@ class WebSocketManager:
             # Don't save empty conversations
             if not messages:
                 # Send proper save result with failure instead of generic error
-                await websocket.send_json({
+                await self._send_json(websocket, {
                     "type": MessageType.SAVE_SESSION_RESULT,
                     "success": False,
                     "error": "Cannot save empty conversation",
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": _now_iso()
                 })
                 return
             
@@ -683,14 +1308,14 @@ class WebSocketManager:
             )
             
             # Send confirmation
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.SAVE_SESSION_RESULT,
                 "success": True,
                 "session_id": session_id,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             
-            logger.info(f"Saved conversation session: {session_id}")
+            logger.info("Saved conversation session: %s", session_id)
             
         except Exception as e:
             logger.error(f"Error saving session: {e}")
@@ -716,16 +1341,16 @@ class WebSocketManager:
             self.llm_client.conversation_history = session.get("messages", [])
             
             # Send confirmation
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.LOAD_SESSION_RESULT,
                 "success": True,
                 "session_id": session_id,
                 "title": session.get("title", ""),
                 "message_count": len(session.get("messages", [])),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             
-            logger.info(f"Loaded conversation session: {session_id}")
+            logger.info("Loaded conversation session: %s", session_id)
             
         except Exception as e:
             logger.error(f"Error loading session: {e}")
@@ -743,13 +1368,13 @@ class WebSocketManager:
             sessions = await self.conversation_storage.list_sessions()
 
             # Send list
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.LIST_SESSIONS_RESULT,
                 "sessions": sessions,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             
-            logger.info(f"Listed {len(sessions)} conversation sessions")
+            logger.info("Listed %d conversation sessions", len(sessions))
             
         except Exception as e:
             logger.error(f"Error listing sessions: {e}")
@@ -768,17 +1393,17 @@ class WebSocketManager:
             success = await self.conversation_storage.delete_session(session_id)
 
             # Send confirmation
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.DELETE_SESSION_RESULT,
                 "success": success,
                 "session_id": session_id,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             
             if success:
-                logger.info(f"Deleted conversation session: {session_id}")
+                logger.info("Deleted conversation session: %s", session_id)
             else:
-                logger.warning(f"Failed to delete conversation session: {session_id}")
+                logger.warning("Failed to delete conversation session: %s", session_id)
             
         except Exception as e:
             logger.error(f"Error deleting session: {e}")
@@ -794,123 +1419,119 @@ class WebSocketManager:
         """
         try:
             message_type = message.get("type", "")
+            handler = self._message_handlers.get(message_type)
             
-            if message_type == MessageType.AUDIO:
-                # Handle audio data
-                audio_base64 = message.get("audio_data", "")
-                if audio_base64:
-                    audio_bytes = base64.b64decode(audio_base64)
-                    await self.handle_audio(websocket, audio_bytes)
-                    
-            elif message_type == MessageType.VISION_FILE_UPLOAD:
-                # Handle vision image upload
-                image_base64 = message.get("image_data", "")
-                if image_base64:
-                    await self._handle_vision_file_upload(websocket, image_base64)
-            
-            elif message_type == "interrupt":
-                # Handle interrupt request
-                logger.info("Received interrupt request from client")
-                self.interrupt_playback.set()
-                await self._send_status(websocket, "interrupted", {})
-                
-            elif message_type == "clear_history":
-                # Clear conversation history
-                self.llm_client.clear_history(keep_system_prompt=True)
-                
-                # Reinitialize conversation context to maintain user name awareness
-                # This ensures the LLM retains knowledge of the user's name even after history is cleared
-                self._initialize_conversation_context()
-                logger.info("Reinitialized user context after clearing history")
-                
-                await self._send_status(websocket, "history_cleared", {})
-                
-            elif message_type == MessageType.GREETING:
-                # Handle greeting request
-                await self._handle_greeting(websocket)
-                
-            elif message_type == MessageType.SILENT_FOLLOWUP:
-                # Handle silent follow-up
-                tier = message.get("tier", 0)
-                await self._handle_silent_followup(websocket, tier)
-                
-            elif message_type == "get_system_prompt":
-                # Send current system prompt to client
-                await self._handle_get_system_prompt(websocket)
-                
-            elif message_type == "update_system_prompt":
-                # Update system prompt
-                new_prompt = message.get("prompt", "")
-                if new_prompt:
-                    await self._handle_update_system_prompt(websocket, new_prompt)
-                else:
-                    await self._send_error(websocket, "Empty system prompt")
-                    
-            elif message_type == "get_user_profile":
-                # Send current user profile to client
-                await self._handle_get_user_profile(websocket)
-                
-            elif message_type == "update_user_profile":
-                # Update user profile
-                name = message.get("name", "")
-                await self._handle_update_user_profile(websocket, name)
-            
-            elif message_type == "get_vision_settings":
-                # Send current vision settings to client
-                await self._handle_get_vision_settings(websocket)
-                
-            elif message_type == "update_vision_settings":
-                # Update vision settings
-                enabled = message.get("enabled", False)
-                await self._handle_update_vision_settings(websocket, enabled)
-                
-            # Session management handlers
-            elif message_type == MessageType.SAVE_SESSION:
-                # Save current session
-                title = message.get("title")
-                session_id = message.get("session_id")  # For updating existing
-                await self._handle_save_session(websocket, title, session_id)
-                
-            elif message_type == MessageType.LOAD_SESSION:
-                # Load a saved session
-                session_id = message.get("session_id")
-                if not session_id:
-                    await self._send_error(websocket, "Session ID is required")
-                    return
-                await self._handle_load_session(websocket, session_id)
-                
-            elif message_type == MessageType.LIST_SESSIONS:
-                # List available sessions
-                await self._handle_list_sessions(websocket)
-                
-            elif message_type == MessageType.DELETE_SESSION:
-                # Delete a session
-                session_id = message.get("session_id")
-                if not session_id:
-                    await self._send_error(websocket, "Session ID is required")
-                    return
-                await self._handle_delete_session(websocket, session_id)
-                
-            elif message_type == "ping":
-                # Respond to ping
-                await websocket.send_json({
-                    "type": "pong",
-                    "timestamp": datetime.now().isoformat()
-                })
-            
-            elif message_type == "pong":
-                # Silently accept pong messages (client keepalive response)
-                # No need to do anything with them
-                pass
-                
+            if handler is not None:
+                await handler(websocket, message)
             else:
-                logger.warning(f"Unknown message type: {message_type}")
+                logger.warning("Unknown message type: %s", message_type)
                 await self._send_error(websocket, f"Unknown message type: {message_type}")
                 
         except Exception as e:
             logger.error(f"Error handling client message: {e}")
             await self._send_error(websocket, f"Message handling error: {str(e)}")
     
+    async def _on_audio(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Handle base64 audio data sent in a JSON message."""
+        audio_base64 = message.get("audio_data", "")
+        if audio_base64:
+            await self.handle_audio(websocket, audio_base64)
+    
+    async def _on_vision_file_upload(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Handle a vision image upload."""
+        image_base64 = message.get("image_data", "")
+        if image_base64:
+            await self._handle_vision_file_upload(websocket, image_base64)
+    
+    async def _on_interrupt(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Handle an interrupt request."""
+        logger.info("Received interrupt request from client")
+        self._interrupt_pipeline()
+        await self._send_status(websocket, "interrupted", {})
+    
+    async def _on_clear_history(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Clear conversation history."""
+        self.llm_client.clear_history(keep_system_prompt=True)
+        
+        # Reinitialize conversation context to maintain user name awareness
+        # This ensures the LLM retains knowledge of the user's name even after history is cleared
+        self._initialize_conversation_context()
+        logger.info("Reinitialized user context after clearing history")
+        
+        await self._send_status(websocket, "history_cleared", {})
+    
+    async def _on_greeting(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Handle a greeting request."""
+        await self._handle_greeting(websocket)
+    
+    async def _on_silent_followup(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Handle a silent follow-up."""
+        await self._handle_silent_followup(websocket, message.get("tier", 0))
+    
+    async def _on_get_system_prompt(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Send current system prompt to client."""
+        await self._handle_get_system_prompt(websocket)
+    
+    async def _on_update_system_prompt(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Update system prompt."""
+        new_prompt = message.get("prompt", "")
+        if new_prompt:
+            await self._handle_update_system_prompt(websocket, new_prompt)
+        else:
+            await self._send_error(websocket, "Empty system prompt")
+    
+    async def _on_get_user_profile(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Send current user profile to client."""
+        await self._handle_get_user_profile(websocket)
+    
+    async def _on_update_user_profile(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Update user profile."""
+        await self._handle_update_user_profile(websocket, message.get("name", ""))
+    
+    async def _on_get_vision_settings(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Send current vision settings to client."""
+        await self._handle_get_vision_settings(websocket)
+    
+    async def _on_update_vision_settings(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Update vision settings."""
+        await self._handle_update_vision_settings(websocket, message.get("enabled", False))
+    
+    async def _on_save_session(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Save current session."""
+        title = message.get("title")
+        session_id = message.get("session_id")  # For updating existing
+        await self._handle_save_session(websocket, title, session_id)
+    
+    async def _on_load_session(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Load a saved session."""
+        session_id = message.get("session_id")
+        if not session_id:
+            await self._send_error(websocket, "Session ID is required")
+            return
+        await self._handle_load_session(websocket, session_id)
+    
+    async def _on_list_sessions(self, websocket: WebSocket, message: Dict[str, Any]):
+        """List available sessions."""
+        await self._handle_list_sessions(websocket)
+    
+    async def _on_delete_session(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Delete a session."""
+        session_id = message.get("session_id")
+        if not session_id:
+            await self._send_error(websocket, "Session ID is required")
+            return
+        await self._handle_delete_session(websocket, session_id)
+    
+    async def _on_ping(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Respond to ping."""
+        await self._send_json(websocket, {
+            "type": "pong",
+            "timestamp": _now_iso()
+        })
+    
+    async def _on_pong(self, websocket: WebSocket, message: Dict[str, Any]):
+        """Silently accept pong messages (client keepalive response)."""
+    
     async def _handle_get_user_profile(self, websocket: WebSocket):
         """
         Send the current user profile to the client.
@@ -919,10 +1540,10 @@ class WebSocketManager:
             websocket: The WebSocket connection
         """
         try:
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.USER_PROFILE,
                 "name": self._get_user_name(),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             logger.info("Sent user profile to client")
         except Exception as e:
@@ -939,21 +1560,21 @@ class WebSocketManager:
         """
         try:
             # Update name
-            success = self._set_user_name(name)
+            success = await self._set_user_name(name)
             
             # Update conversation context with the new name
             if success:
                 # Initialize conversation context with the updated name
                 self._initialize_conversation_context()
-                logger.info(f"Updated user profile name to: {name} and refreshed conversation context")
+                logger.info("Updated user profile name to: %s and refreshed conversation context", name)
             else:
                 logger.error("Failed to update user profile")
             
             # Send confirmation
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.USER_PROFILE_UPDATED,
                 "success": success,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             
             if not success:
@@ -971,10 +1592,10 @@ class WebSocketManager:
             websocket: The WebSocket connection
         """
         try:
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.SYSTEM_PROMPT,
                 "prompt": self.system_prompt,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             logger.info("Sent system prompt to client")
         except Exception as e:
@@ -993,9 +1614,6 @@ class WebSocketManager:
         }
         
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(self.vision_settings_path), exist_ok=True)
-            
             # Read from file if it exists
             if os.path.exists(self.vision_settings_path):
                 with open(self.vision_settings_path, "r") as f:
@@ -1004,8 +1622,7 @@ class WebSocketManager:
                         return settings
             
             # If file doesn't exist or is empty, write default settings
-            with open(self.vision_settings_path, "w") as f:
-                json.dump(default_settings, f, indent=2)
+            write_file_atomic(self.vision_settings_path, json.dumps(default_settings, indent=2))
             
             return default_settings
             
@@ -1021,9 +1638,7 @@ class WebSocketManager:
             bool: Whether the save was successful
         """
         try:
-            os.makedirs(os.path.dirname(self.vision_settings_path), exist_ok=True)
-            with open(self.vision_settings_path, "w") as f:
-                json.dump(self.vision_settings, f, indent=2)
+            write_file_atomic(self.vision_settings_path, json.dumps(self.vision_settings, indent=2))
             return True
         except Exception as e:
             logger.error(f"Error saving vision settings: {e}")
@@ -1037,10 +1652,10 @@ class WebSocketManager:
             websocket: The WebSocket connection
         """
         try:
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.VISION_SETTINGS,
                 "enabled": self.vision_settings.get("enabled", False),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             logger.info("Sent vision settings to client")
         except Exception as e:
@@ -1060,16 +1675,16 @@ class WebSocketManager:
             self.vision_settings["enabled"] = enabled
             
             # Save to file
-            success = self._save_vision_settings()
+            success = await asyncio.to_thread(self._save_vision_settings)
             
             # Send confirmation
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.VISION_SETTINGS_UPDATED,
                 "success": success,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             
-            logger.info(f"Updated vision settings: enabled={enabled}")
+            logger.info("Updated vision settings: enabled=%s", enabled)
         except Exception as e:
             logger.error(f"Error updating vision settings: {e}")
             await self._send_error(websocket, f"Error updating vision settings: {str(e)}")
@@ -1091,16 +1706,18 @@ class WebSocketManager:
             # Update in memory
             self.system_prompt = new_prompt
             
+            # Cached responses were generated under the old prompt
+            if self.response_cache is not None:
+                self.response_cache.clear()
+            
             # Save to file
-            os.makedirs(os.path.dirname(self.prompt_path), exist_ok=True)
-            with open(self.prompt_path, "w") as f:
-                f.write(new_prompt)
+            await asyncio.to_thread(write_file_atomic, self.prompt_path, new_prompt)
             
             # Send confirmation
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.SYSTEM_PROMPT_UPDATED,
                 "success": True,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             
             logger.info("Updated system prompt")
@@ -1153,25 +1770,22 @@ class WebSocketManager:
                 return
                 
             # Notify client that upload was received
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.VISION_FILE_UPLOAD_RESULT,
                 "success": True,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             
             # Send processing status
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.VISION_PROCESSING,
                 "status": "Analyzing image...",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             
             # Process image with vision service
             logger.info("Processing vision image with SmolVLM")
             
-            # Import vision service (to avoid circular imports)
-            from ..services.vision import vision_service
-            
             # Create a descriptive prompt for the image
             prompt = "Describe this image in detail. Include information about objects, people, scenes, text, and any notable elements."
             
@@ -1186,10 +1800,10 @@ class WebSocketManager:
             self.current_vision_context = vision_context
             
             # Send vision ready notification with the generated context
-            await websocket.send_json({
+            await self._send_json(websocket, {
                 "type": MessageType.VISION_READY,
                 "context": vision_context,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             
             logger.info("Vision processing complete with SmolVLM model")
@@ -1197,11 +1811,70 @@ class WebSocketManager:
             logger.error(f"Error processing vision image: {e}")
             await self._send_error(websocket, f"Vision processing error: {str(e)}")
 
+# Handlers for binary frames sent by the client, keyed by type tag
+BINARY_FRAME_HANDLERS = {
+    FrameType.AUDIO: WebSocketManager.handle_audio,
+}
+
+async def handle_binary_frame(manager: WebSocketManager, websocket: WebSocket, frame: bytes):
+    """
+    Dispatch a binary WebSocket frame based on its type tag.
+    
+    Args:
+        manager: The connection's WebSocket manager
+        websocket: The WebSocket connection
+        frame: Raw frame bytes (4-byte header followed by payload)
+    """
+    if len(frame) < FRAME_HEADER_SIZE:
+        await manager._send_error(websocket, "Malformed binary frame")
+        return
+    
+    frame_type = frame[0]
+    handler = BINARY_FRAME_HANDLERS.get(frame_type)
+    
+    if handler is not None:
+        await handler(manager, websocket, memoryview(frame)[FRAME_HEADER_SIZE:])
+    else:
+        logger.warning("Unknown binary frame type: %d", frame_type)
+        await manager._send_error(websocket, f"Unknown binary frame type: {frame_type}")
+
+async def receive_messages(manager: WebSocketManager, websocket: WebSocket):
+    """
+    Read and dispatch client messages until the connection closes.
+    
+    Args:
+        manager: The connection's WebSocket manager
+        websocket: The WebSocket connection
+        
+    Raises:
+        WebSocketDisconnect: When the client disconnects
+    """
+    # Liveness is handled by protocol-level WebSocket pings (see the uvicorn
+    # ws_ping_* settings), so an idle connection simply waits here
+    while True:
+        message = await websocket.receive()
+        
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        
+        # Binary frames carry audio, text frames carry JSON control messages.
+        # JSON may also arrive as a binary frame, which orjson parses from
+        # the raw bytes without a UTF-8 decode to str first.
+        data = message.get("bytes")
+        if data is not None:
+            if data[:1] == b"{":
+                await manager.handle_client_message(websocket, orjson.loads(data))
+            else:
+                await handle_binary_frame(manager, websocket, data)
+        elif message.get("text") is not None:
+            await manager.handle_client_message(websocket, orjson.loads(message["text"]))
+
 async def websocket_endpoint(
     websocket: WebSocket,
     transcriber: WhisperTranscriber,
     llm_client: LLMClient,
-    tts_client: TTSClient
+    tts_client: TTSClient,
+    response_cache: Optional[ResponseCache] = None
 ):
     """
     FastAPI WebSocket endpoint.
@@ -1211,33 +1884,17 @@ async def websocket_endpoint(
         transcriber: Whisper transcription service
         llm_client: LLM client service
         tts_client: TTS client service
+        response_cache: Shared response cache (disabled if None)
     """
     # Create WebSocket manager
-    manager = WebSocketManager(transcriber, llm_client, tts_client)
+    manager = WebSocketManager(transcriber, llm_client, tts_client, response_cache)
     
     try:
         # Accept connection
         await manager.connect(websocket)
         
-        # Handle messages
-        while True:
-            try:
-                # Receive message with a timeout
-                message = await asyncio.wait_for(
-                    websocket.receive_json(),
-                    timeout=30.0  # 30 second timeout
-                )
-                
-                # Process message
-                await manager.handle_client_message(websocket, message)
-                
-            except asyncio.TimeoutError:
-                # Send a ping to keep the connection alive
-                await websocket.send_json({
-                    "type": "ping",
-                    "timestamp": datetime.now().isoformat()
-                })
-                
+        # Handle messages; pipeline tasks are cancelled when this returns
+        await manager.run(websocket, receive_messages(manager, websocket))
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
     except Exception as e:
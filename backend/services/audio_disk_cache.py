@@ -0,0 +1,231 @@
+"""
+Audio Disk Cache
+
+Persists cached TTS audio to disk so it survives restarts. Writes are queued
+and flushed in batches by a background task, keeping filesystem I/O off the
+streaming path.
+"""
+
+import os
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Queued writes are collected for this long (seconds), up to the batch size,
+# and then written together in one worker thread hop
+WRITE_BATCH_WINDOW = 0.1
+WRITE_BATCH_SIZE = 16
+
+# When the directory grows past its budget, the least recently used files are
+# removed until it is back under this fraction of the budget
+PRUNE_TARGET_RATIO = 0.9
+
+class AudioDiskCache:
+    """
+    Directory of cached audio blobs, one file per cache key.
+
+    Entries are opaque bytes; the caller decides how audio is serialized.
+    File modification times double as the LRU order, so no index is kept.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 500 * 1024 * 1024, queue_size: int = 256):
+        """
+        Initialize the disk cache.
+
+        Args:
+            directory: Directory holding the cache files (created if missing)
+            max_bytes: Disk budget for cached audio
+            queue_size: Maximum number of writes waiting for the writer task;
+                further writes are dropped rather than delaying the caller
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._writer_task: Optional[asyncio.Task] = None
+        self._total_bytes: Optional[int] = None
+
+        self.reads = 0
+        self.writes = 0
+        self.dropped = 0
+
+        logger.info(f"Initialized audio disk cache in {directory} (max {max_bytes} bytes)")
+
+    def _path(self, key: bytes) -> str:
+        """
+        Get the file path for a cache key.
+        """
+        return os.path.join(self.directory, f"{key.hex()}.bin")
+
+    def start(self):
+        """
+        Start the background writer. Must be called from the running event loop.
+        """
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._writer())
+
+    async def close(self):
+        """
+        Stop the background writer; writes still queued are discarded.
+        """
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+
+    def store(self, key: bytes, data: bytes) -> None:
+        """
+        Queue an entry to be written in the background.
+
+        Args:
+            key: Cache key
+            data: Serialized audio
+        """
+        try:
+            self._queue.put_nowait((key, data))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def load(self, key: bytes) -> Optional[bytes]:
+        """
+        Read an entry from disk.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[bytes]: Serialized audio, or None if not cached
+        """
+        return await asyncio.to_thread(self._read, key)
+
+    def _read(self, key: bytes) -> Optional[bytes]:
+        """
+        Read an entry and mark it as recently used.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error(f"Error reading audio cache file: {e}")
+            return None
+
+        self.reads += 1
+        return data
+
+    async def _writer(self):
+        """
+        Write queued entries to disk in batches.
+        """
+        while True:
+            batch: List[Tuple[bytes, bytes]] = [await self._queue.get()]
+
+            # Let more writes arrive, then take what is queued
+            await asyncio.sleep(WRITE_BATCH_WINDOW)
+            while len(batch) < WRITE_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                logger.error(f"Error writing audio cache files: {e}")
+
+    def _write_batch(self, batch: List[Tuple[bytes, bytes]]):
+        """
+        Write a batch of entries, then prune the directory if it is over budget.
+
+        Files are written to a temporary name and renamed into place, so a
+        concurrent read never sees a partial file. They are not fsynced: a
+        file lost in a crash only costs a re-synthesis.
+        """
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._scan())
+
+        for key, data in batch:
+            path = self._path(key)
+            temp_path = f"{path}.tmp"
+
+            # An overwritten file no longer counts towards the total
+            try:
+                previous_size = os.path.getsize(path)
+            except OSError:
+                previous_size = 0
+
+            try:
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except OSError as e:
+                # _scan only sees .bin files, so a leftover temp file would
+                # never be counted or pruned
+                logger.error(f"Error writing audio cache file: {e}")
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                continue
+
+            self._total_bytes += len(data) - previous_size
+            self.writes += 1
+
+        if self._total_bytes > self.max_bytes:
+            self._prune()
+
+    def _scan(self) -> List[Tuple[float, int, str]]:
+        """
+        List cache files as (mtime, size, path) tuples.
+        """
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".bin"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _prune(self):
+        """
+        Remove least recently used files until the directory is under budget.
+        """
+        files = sorted(self._scan())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * PRUNE_TARGET_RATIO
+        removed = 0
+
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+
+        self._total_bytes = total
+        logger.info(f"Pruned {removed} audio cache files")
+
+    def get_config(self) -> Dict[str, Any]:
+        """
+        Get the current disk cache configuration and statistics.
+
+        Returns:
+            Dict[str, Any]: Disk cache configuration and counters
+        """
+        return {
+            "directory": self.directory,
+            "max_bytes": self.max_bytes,
+            "reads": self.reads,
+            "writes": self.writes,
+            "dropped": self.dropped
+        }
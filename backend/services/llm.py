@@ -4,15 +4,24 @@ LLM Service
 Handles communication with the local LLM API endpoint.
 """
 
-import json
-import requests
+import time
+import orjson
+import asyncio
+import aiohttp
 import logging
-from typing import Dict, Any, List, Optional
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, AsyncGenerator
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ErrorReply(str):
+    """
+    Apology text that stream_response yields in place of a response when the
+    request fails, so callers can tell it apart from generated tokens.
+    """
+
 class LLMClient:
     """
     Client for communicating with a local LLM API.
@@ -27,7 +36,9 @@ class LLMClient:
         model: str = "default",
         temperature: float = 0.7,
         max_tokens: int = 2048,
-        timeout: int = 60
+        timeout: int = 60,
+        max_concurrency: int = 4,
+        session=None
     ):
         """
         Initialize the LLM client.
@@ -38,12 +49,20 @@ class LLMClient:
             temperature: Sampling temperature (0.0 to 1.0)
             max_tokens: Maximum tokens to generate
             timeout: Request timeout in seconds
+            max_concurrency: Maximum number of concurrent streaming requests
+            session: Shared aiohttp.ClientSession for keep-alive connections
+                (a temporary session is created per request if omitted)
         """
         self.api_endpoint = api_endpoint
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.session = session
+        
+        # Limits in-flight requests shared by all connections using this client
+        self._semaphore = asyncio.Semaphore(max_concurrency)
         
         # State tracking
         self.is_processing = False
@@ -51,6 +70,17 @@ class LLMClient:
         
         logger.info(f"Initialized LLM Client with endpoint={api_endpoint}")
         
+    @asynccontextmanager
+    async def _client_session(self):
+        """
+        Yield the shared HTTP session, or a temporary one if none was provided.
+        """
+        if self.session is not None:
+            yield self.session
+        else:
+            async with aiohttp.ClientSession() as session:
+                yield session
+    
     def add_to_history(self, role: str, content: str) -> None:
         """
         Add a message to the conversation history.
@@ -75,8 +105,82 @@ class LLMClient:
             else:
                 self.conversation_history = self.conversation_history[-50:]
     
-    def get_response(self, user_input: str, system_prompt: Optional[str] = None, 
-                    add_to_history: bool = True, temperature: Optional[float] = None) -> Dict[str, Any]:
+    def _build_payload(self, user_input: str, system_prompt: Optional[str],
+                       add_to_history: bool, temperature: Optional[float],
+                       stream: bool = False,
+                       history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """
+        Build the chat completion request payload for the given user input.
+        
+        Args:
+            user_input: User's text input
+            system_prompt: Optional system prompt to set context
+            add_to_history: Whether to add the user input to conversation history
+            temperature: Optional temperature override (0.0 to 1.0)
+            stream: Whether to request a streamed (SSE) response
+            history: Messages to send instead of the conversation history
+            
+        Returns:
+            Request payload for the LLM API
+        """
+        # Prepare messages
+        messages = []
+        
+        # Add system prompt if provided and not already in history
+        if system_prompt:
+            messages.append({
+                "role": "system",
+                "content": system_prompt
+            })
+        
+        # Add user input to history if it's not empty and add_to_history is True
+        if user_input.strip() and add_to_history:
+            self.add_to_history("user", user_input)
+        
+        # Add conversation history (which now includes the user input if add_to_history=True)
+        messages.extend(self.conversation_history if history is None else history)
+        
+        # Only add user input directly if not adding to history
+        # This ensures special cases (greetings/followups) work while preventing duplication for normal speech
+        if user_input.strip() and not add_to_history:
+            messages.append({
+                "role": "user",
+                "content": user_input
+            })
+        
+        # Prepare request payload with custom temperature if provided
+        payload = {
+            "model": self.model if self.model != "default" else None,
+            "messages": messages,
+            "temperature": temperature if temperature is not None else self.temperature,
+            "max_tokens": self.max_tokens,
+            "stream": stream or None
+        }
+        
+        # Remove None values
+        payload = {k: v for k, v in payload.items() if v is not None}
+        
+        logger.info(f"Sending request to LLM API with {len(messages)} messages")
+        
+        # Add more detailed logging to help debug message duplication
+        message_roles = [msg["role"] for msg in messages]
+        user_message_count = message_roles.count("user")
+        logger.info(f"Message roles: {message_roles}, user messages: {user_message_count}")
+        
+        # Log the full payload (truncated for readability); serializing the
+        # whole history is only worth it when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            payload_str = orjson.dumps(payload).decode("utf-8")
+            if len(payload_str) > 500:
+                logger.debug(f"Payload (truncated): {payload_str[:500]}...")
+            else:
+                logger.debug(f"Payload: {payload_str}")
+        
+        return payload
+    
+    async def get_response(self, user_input: str, system_prompt: Optional[str] = None,
+                           add_to_history: bool = True, temperature: Optional[float] = None,
+                           history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
         """
         Get a response from the LLM for the given user input.
         
@@ -85,76 +189,33 @@ class LLMClient:
             system_prompt: Optional system prompt to set context
             add_to_history: Whether to add this exchange to conversation history
             temperature: Optional temperature override (0.0 to 1.0)
+            history: Messages to send instead of the conversation history, so
+                callers need not swap the shared history around the request
             
         Returns:
             Dictionary containing the LLM response and metadata
         """
         self.is_processing = True
-        start_time = logging.Formatter.converter()
+        start_time = time.time()
         
         try:
-            # Prepare messages
-            messages = []
-            
-            # Add system prompt if provided and not already in history
-            if system_prompt:
-                messages.append({
-                    "role": "system",
-                    "content": system_prompt
-                })
-            
-            # Add user input to history if it's not empty and add_to_history is True
-            if user_input.strip() and add_to_history:
-                self.add_to_history("user", user_input)
-            
-            # Add conversation history (which now includes the user input if add_to_history=True)
-            messages.extend(self.conversation_history)
-            
-            # Only add user input directly if not adding to history
-            # This ensures special cases (greetings/followups) work while preventing duplication for normal speech
-            if user_input.strip() and not add_to_history:
-                messages.append({
-                    "role": "user",
-                    "content": user_input
-                })
-            
-            # Prepare request payload with custom temperature if provided
-            payload = {
-                "model": self.model if self.model != "default" else None,
-                "messages": messages,
-                "temperature": temperature if temperature is not None else self.temperature,
-                "max_tokens": self.max_tokens
-            }
-            
-            # Remove None values
-            payload = {k: v for k, v in payload.items() if v is not None}
-            
-            # Log the full payload (truncated for readability)
-            payload_str = json.dumps(payload)
-            logger.info(f"Sending request to LLM API with {len(messages)} messages")
-            
-            # Add more detailed logging to help debug message duplication
-            message_roles = [msg["role"] for msg in messages]
-            user_message_count = message_roles.count("user")
-            logger.info(f"Message roles: {message_roles}, user messages: {user_message_count}")
-            
-            if len(payload_str) > 500:
-                logger.debug(f"Payload (truncated): {payload_str[:500]}...")
-            else:
-                logger.debug(f"Payload: {payload_str}")
+            payload = self._build_payload(user_input, system_prompt, add_to_history, temperature,
+                                          history=history)
             
             # Send request to LLM API
-            response = requests.post(
-                self.api_endpoint,
-                json=payload,
-                timeout=self.timeout
-            )
-            
-            # Check if request was successful
-            response.raise_for_status()
-            
-            # Parse response
-            result = response.json()
+            async with self._semaphore:
+                async with self._client_session() as session:
+                    async with session.post(
+                        self.api_endpoint,
+                        data=orjson.dumps(payload),
+                        headers={"Content-Type": "application/json"},
+                        timeout=aiohttp.ClientTimeout(total=self.timeout)
+                    ) as response:
+                        # Check if request was successful
+                        response.raise_for_status()
+                        
+                        # Parse response
+                        result = orjson.loads(await response.read())
             
             # Extract assistant response
             assistant_message = result.get("choices", [{}])[0].get("message", {}).get("content", "")
@@ -164,8 +225,7 @@ class LLMClient:
                 self.add_to_history("assistant", assistant_message)
             
             # Calculate processing time
-            end_time = logging.Formatter.converter()
-            processing_time = end_time[0] - start_time[0]
+            processing_time = time.time() - start_time
             
             logger.info(f"Received response from LLM API after {processing_time:.2f}s")
             
@@ -176,7 +236,7 @@ class LLMClient:
                 "model": result.get("model", "unknown")
             }
             
-        except requests.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             logger.error(f"LLM API request error: {e}")
             error_response = f"I'm sorry, I encountered a problem connecting to my language model. {str(e)}"
             
@@ -186,7 +246,7 @@ class LLMClient:
                 self.add_to_history("assistant", error_response)
                 
                 # If we get a 400 Bad Request, the context might be corrupt
-                if isinstance(e, requests.exceptions.HTTPError) and e.response.status_code == 400:
+                if isinstance(e, aiohttp.ClientResponseError) and e.status == 400:
                     logger.warning("Received 400 error, clearing conversation history to recover")
                     # Keep only system prompt if it exists
                     self.clear_history(keep_system_prompt=True)
@@ -198,7 +258,8 @@ class LLMClient:
         except Exception as e:
             logger.error(f"LLM processing error: {e}")
             error_response = "I'm sorry, I encountered an unexpected error. Please try again."
-            self.add_to_history("assistant", error_response)
+            if add_to_history:
+                self.add_to_history("assistant", error_response)
             return {
                 "text": error_response,
                 "error": str(e)
@@ -206,6 +267,89 @@ class LLMClient:
         finally:
             self.is_processing = False
     
+    async def stream_response(self, user_input: str, system_prompt: Optional[str] = None,
+                              add_to_history: bool = True,
+                              temperature: Optional[float] = None) -> AsyncGenerator[str, None]:
+        """
+        Stream a response from the LLM token by token.
+        
+        Uses the OpenAI-compatible SSE streaming format so callers can start
+        working on the first tokens (e.g. speech synthesis) while the rest of
+        the response is still being generated.
+        
+        Args:
+            user_input: User's text input
+            system_prompt: Optional system prompt to set context
+            add_to_history: Whether to add this exchange to conversation history
+            temperature: Optional temperature override (0.0 to 1.0)
+            
+        Yields:
+            Text fragments of the assistant response as they arrive, or a
+            single ErrorReply if the request fails
+        """
+        self.is_processing = True
+        start_time = time.time()
+        parts = []
+        
+        try:
+            payload = self._build_payload(user_input, system_prompt, add_to_history, temperature, stream=True)
+            
+            async with self._semaphore:
+                async with self._client_session() as session:
+                    async with session.post(
+                        self.api_endpoint,
+                        data=orjson.dumps(payload),
+                        headers={"Content-Type": "application/json"},
+                        # The timeout bounds connecting and each wait for the
+                        # next token, not the whole generation, so long
+                        # replies aren't cut off while tokens are flowing
+                        timeout=aiohttp.ClientTimeout(
+                            total=None,
+                            sock_connect=self.timeout,
+                            sock_read=self.timeout
+                        )
+                    ) as response:
+                        response.raise_for_status()
+                        
+                        # Each SSE event is a single "data: {...}" line; orjson
+                        # parses the raw bytes without decoding to str first
+                        async for raw_line in response.content:
+                            line = raw_line.strip()
+                            if not line.startswith(b"data:"):
+                                continue
+                            
+                            data = line[len(b"data:"):].strip()
+                            if data == b"[DONE]":
+                                break
+                            
+                            try:
+                                chunk = orjson.loads(data)
+                            except orjson.JSONDecodeError:
+                                logger.warning(f"Skipping malformed LLM stream event: {data[:100]!r}")
+                                continue
+                            
+                            token = chunk.get("choices", [{}])[0].get("delta", {}).get("content")
+                            if token:
+                                parts.append(token)
+                                yield token
+            
+            logger.info(f"Streamed response from LLM API in {time.time() - start_time:.2f}s")
+        
+        except Exception as e:
+            logger.error(f"LLM streaming error: {e}")
+            error_response = ErrorReply(
+                f"I'm sorry, I encountered a problem connecting to my language model. {str(e)}")
+            # A reply that failed part-way keeps the text already streamed
+            if not parts:
+                parts = [error_response]
+            yield error_response
+        finally:
+            # Add assistant response to history (only if we added the user input)
+            assistant_message = "".join(parts)
+            if assistant_message and add_to_history:
+                self.add_to_history("assistant", assistant_message)
+            self.is_processing = False
+    
     def clear_history(self, keep_system_prompt: bool = True) -> None:
         """
         Clear conversation history.
@@ -231,6 +375,7 @@ class LLMClient:
             "temperature": self.temperature,
             "max_tokens": self.max_tokens,
             "timeout": self.timeout,
+            "max_concurrency": self.max_concurrency,
             "is_processing": self.is_processing,
             "history_length": len(self.conversation_history)
         }
@@ -0,0 +1,253 @@
+"""
+Response Cache Service
+
+Caches complete assistant turns (response text and synthesized audio) keyed
+on the normalized user transcript, so repeated phrases skip LLM and TTS.
+Optionally, rewordings of a cached phrase are matched by sentence-embedding
+similarity.
+"""
+
+import re
+import logging
+import asyncio
+import threading
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+from cachetools import TTLCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Punctuation Whisper adds or drops between otherwise identical utterances
+_PUNCTUATION_PATTERN = re.compile(r"[^\w\s']")
+
+class ResponseCache:
+    """
+    In-memory TTL/LRU cache of assistant responses.
+
+    Entries ignore conversation history, so the cache is only suitable for
+    short, context-free phrases (greetings, "repeat that", wake phrases).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: int = 3600,
+        semantic_threshold: float = 0.0,
+        embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    ):
+        """
+        Initialize the response cache.
+
+        Args:
+            maxsize: Maximum number of cached responses
+            ttl: Time in seconds before an entry expires
+            semantic_threshold: Minimum cosine similarity for a reworded
+                transcript to reuse a cached response (0 disables matching)
+            embedding_model: Hugging Face model used to embed transcripts
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+        # Semantic matching state. The embedding model is loaded on first use;
+        # embeddings of missed transcripts wait in _query_embeddings until the
+        # response for them is stored, so put() never runs the model.
+        self.semantic_threshold = semantic_threshold
+        self.semantic_enabled = semantic_threshold > 0
+        self.embedding_model = embedding_model
+        self._tokenizer = None
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._embeddings: Dict[str, np.ndarray] = {}
+        self._query_embeddings: Dict[str, np.ndarray] = {}
+        self.semantic_hits = 0
+
+        logger.info(f"Initialized response cache with maxsize={maxsize}, ttl={ttl}s, "
+                    f"semantic_threshold={semantic_threshold}")
+
+    @staticmethod
+    def normalize(transcript: str) -> str:
+        """
+        Normalize a transcript into a cache key.
+
+        Args:
+            transcript: User transcript
+
+        Returns:
+            str: Lowercased transcript without punctuation or extra whitespace
+        """
+        return " ".join(_PUNCTUATION_PATTERN.sub("", transcript.lower()).split())
+
+    def get(self, transcript: str) -> Optional[Tuple[str, List[bytes]]]:
+        """
+        Look up a cached response.
+
+        Args:
+            transcript: User transcript
+
+        Returns:
+            Optional[Tuple[str, List[bytes]]]: Response text and audio chunks,
+                or None on a miss
+        """
+        entry = self._cache.get(self.normalize(transcript))
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    async def lookup(self, transcript: str) -> Optional[Tuple[str, List[bytes]]]:
+        """
+        Look up a cached response, falling back to the most similar cached
+        transcript when semantic matching is enabled.
+
+        Args:
+            transcript: User transcript
+
+        Returns:
+            Optional[Tuple[str, List[bytes]]]: Response text and audio chunks,
+                or None on a miss
+        """
+        entry = self.get(transcript)
+        if entry is not None or not self.semantic_enabled:
+            return entry
+
+        key = self.normalize(transcript)
+        if not key:
+            return None
+
+        # Embedding runs the model, so keep it off the event loop
+        match = await asyncio.to_thread(self._find_similar, key)
+        if match is None:
+            return None
+
+        entry = self._cache.get(match)
+        if entry is not None:
+            self.misses -= 1
+            self.semantic_hits += 1
+            logger.info(f"Semantic cache hit: '{key}' matched '{match}'")
+        return entry
+
+    def _load_model(self):
+        """
+        Load the embedding model on first use.
+        """
+        with self._model_lock:
+            if self._model is None:
+                from transformers import AutoTokenizer, AutoModel
+
+                logger.info(f"Loading embedding model: {self.embedding_model}")
+                self._tokenizer = AutoTokenizer.from_pretrained(self.embedding_model)
+                self._model = AutoModel.from_pretrained(self.embedding_model).eval()
+
+    def _embed(self, text: str) -> np.ndarray:
+        """
+        Embed text as a unit-length vector (mean-pooled token embeddings).
+
+        Args:
+            text: Normalized transcript
+
+        Returns:
+            np.ndarray: float32 embedding
+        """
+        import torch
+
+        if self._model is None:
+            self._load_model()
+
+        inputs = self._tokenizer([text], padding=True, truncation=True, return_tensors="pt")
+        with torch.no_grad():
+            hidden = self._model(**inputs).last_hidden_state
+
+        mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        pooled = torch.nn.functional.normalize(pooled, dim=1)
+        return pooled[0].cpu().numpy().astype(np.float32)
+
+    def _find_similar(self, key: str) -> Optional[str]:
+        """
+        Find the cached transcript most similar to a missed one.
+
+        Runs in a worker thread and never touches the TTL cache itself, so it
+        can run alongside lookups and stores on the event loop.
+
+        Args:
+            key: Normalized transcript that missed the exact lookup
+
+        Returns:
+            Optional[str]: Key of the best match above the threshold, or None
+        """
+        try:
+            embedding = self._embed(key)
+        except Exception as e:
+            logger.error(f"Error embedding transcript for semantic cache: {e}")
+            return None
+
+        # Remember the embedding so the response stored for this transcript
+        # becomes searchable without embedding it again
+        if len(self._query_embeddings) >= self.maxsize:
+            self._query_embeddings.clear()
+        self._query_embeddings[key] = embedding
+
+        candidates = list(self._embeddings.items())
+        if not candidates:
+            return None
+
+        # Brute force is fine at cache sizes of a few hundred entries
+        matrix = np.stack([vector for _, vector in candidates])
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] >= self.semantic_threshold:
+            return candidates[best][0]
+        return None
+
+    def put(self, transcript: str, text: str, audio_chunks: List[bytes]) -> None:
+        """
+        Store a complete response.
+
+        Args:
+            transcript: User transcript the response was generated for
+            text: Response text
+            audio_chunks: Synthesized audio chunks, in playback order
+        """
+        key = self.normalize(transcript)
+        if key and text.strip() and audio_chunks:
+            self._cache[key] = (text, audio_chunks)
+
+            if self.semantic_enabled:
+                embedding = self._query_embeddings.pop(key, None)
+                if embedding is not None:
+                    self._embeddings[key] = embedding
+
+                # Forget embeddings of entries that expired or were evicted
+                for stale in [k for k in self._embeddings if k not in self._cache]:
+                    del self._embeddings[stale]
+
+    def clear(self) -> None:
+        """
+        Drop all cached responses, e.g. after the system prompt changes.
+        """
+        self._cache.clear()
+        self._embeddings.clear()
+        self._query_embeddings.clear()
+
+    def get_config(self) -> Dict[str, Any]:
+        """
+        Get the current cache configuration and statistics.
+
+        Returns:
+            Dict[str, Any]: Cache configuration and hit/miss counts
+        """
+        return {
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "semantic_threshold": self.semantic_threshold,
+            "semantic_hits": self.semantic_hits
+        }
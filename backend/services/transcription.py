@@ -7,9 +7,11 @@ Uses Faster Whisper to transcribe speech audio.
 import numpy as np
 import logging
 import io  # For BytesIO
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Union
+import soundfile as sf
 from faster_whisper import WhisperModel
 import time
+import asyncio
 import torch  # For CUDA availability check
 
 # Configure logging
@@ -81,12 +83,12 @@ class WhisperTranscriber:
             logger.error(f"Failed to load Whisper model: {e}")
             raise
     
-    def transcribe(self, audio: np.ndarray) -> Tuple[str, Dict[str, Any]]:
+    def transcribe(self, audio: Union[np.ndarray, bytes, memoryview]) -> Tuple[str, Dict[str, Any]]:
         """
         Transcribe audio data to text.
         
         Args:
-            audio: Audio data as numpy array
+            audio: Audio samples as a numpy array, or WAV file bytes
             
         Returns:
             Tuple[str, Dict[str, Any]]: 
@@ -97,23 +99,13 @@ class WhisperTranscriber:
         self.is_processing = True
         
         try:
-            # Handle WAV data (if audio is in uint8 format, it contains WAV headers)
-            if audio.dtype == np.uint8:
-                # First check the RIFF header to confirm this is WAV data
-                header = bytes(audio[:44])
-                if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
-                    # Create a file-like object that Whisper can read from
-                    audio_file = io.BytesIO(bytes(audio))
-                    # The transcribe method expects a file-like object with read method
-                    audio = audio_file
-                else:
-                    # Not a proper WAV header
-                    logger.warning("Received audio data with incorrect WAV header")
-                    # Attempt to process as raw data
-                    audio = audio.astype(np.float32) / np.max(np.abs(audio)) if np.max(np.abs(audio)) > 0 else audio
-            else:
-                # Normalize audio if it's raw float data
-                audio = audio.astype(np.float32) / np.max(np.abs(audio)) if np.max(np.abs(audio)) > 0 else audio
+            # Handle WAV data: decode the PCM straight to float32 in one pass
+            if isinstance(audio, (bytes, bytearray, memoryview)):
+                audio, _ = sf.read(io.BytesIO(audio), dtype="float32")
+            
+            # Normalize audio
+            peak = np.max(np.abs(audio)) if audio.size else 0
+            audio = audio.astype(np.float32, copy=False) / peak if peak > 0 else audio
             
             # Transcribe
             segments, info = self.model.transcribe(
@@ -146,6 +138,21 @@ class WhisperTranscriber:
         finally:
             self.is_processing = False
     
+    async def transcribe_async(self, audio: Union[np.ndarray, bytes, memoryview]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Transcribe audio data without blocking the event loop.
+        
+        Whisper inference runs in a worker thread so other connections keep
+        being served while the model is busy.
+        
+        Args:
+            audio: Audio samples as a numpy array, or WAV file bytes
+            
+        Returns:
+            Tuple[str, Dict[str, Any]]: Transcribed text and metadata (see transcribe)
+        """
+        return await asyncio.to_thread(self.transcribe, audio)
+    
     def transcribe_streaming(self, audio_generator):
         """
         Stream transcription results from an audio generator.
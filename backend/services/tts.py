@@ -4,19 +4,134 @@ Text-to-Speech Service
 Handles communication with the local TTS API endpoint.
 """
 
-import json
+import orjson
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
 import logging
-import io
+import struct
 import time
-import base64
 import asyncio
-from typing import Dict, Any, List, Optional, BinaryIO, Generator, AsyncGenerator
+import hashlib
+import re
+import unicodedata
+from collections import OrderedDict
+from .audio_disk_cache import AudioDiskCache
+from contextlib import aclosing, asynccontextmanager
+from typing import Dict, Any, List, Optional, Generator, AsyncGenerator, Callable, NamedTuple, Tuple, Union
+
+# Optional: compresses cached speech (TTS_CACHE_CODEC=opus). opuslib raises
+# a plain Exception rather than ImportError when libopus itself is missing.
+try:
+    import opuslib
+except Exception:
+    opuslib = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sentence boundaries used to split long text into independently
+# synthesized pieces
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.?!])\s+")
+
+# Kinds of serialized cache entries (see _serialize_entry)
+ENTRY_FILE, ENTRY_CHUNKS, ENTRY_OPUS = 0, 1, 2
+ENTRY_HEADER = struct.Struct("<BII")
+
+# Opus frame duration used for cached audio, and the sample rates Opus
+# can encode natively
+OPUS_FRAME_MS = 20
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+class EncodedAudio(NamedTuple):
+    """Opus packets for a cached utterance, with the original PCM length."""
+    packets: Tuple[bytes, ...]
+    pcm_length: int
+
+# Audio chunks a prefetched utterance buffers ahead of its reader (~6s of
+# 100ms chunks); synthesis waits once the buffer is full
+PREFETCH_BUFFER_CHUNKS = 64
+
+class PrefetchedSpeech:
+    """
+    Synthesis started ahead of playback.
+
+    A background task drains an audio chunk stream into a buffer as soon as
+    the handle is created; chunks() replays the buffer and then follows the
+    stream, so a sentence's audio can be ready before its turn to play.
+    """
+
+    def __init__(self, text: str, chunks: AsyncGenerator[bytes, None]):
+        """
+        Start consuming an audio chunk stream.
+
+        Args:
+            text: Text being synthesized
+            chunks: Audio chunk stream for the text
+        """
+        self.text = text
+        # None marks the end of the audio; an exception is passed through to
+        # be raised by the reader
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=PREFETCH_BUFFER_CHUNKS)
+        self._task = asyncio.create_task(self._fill(chunks))
+        self._callbacks: List[Callable[[], None]] = []
+        self._closed = False
+
+    async def _fill(self, chunks: AsyncGenerator[bytes, None]):
+        """
+        Move audio chunks from the stream into the buffer.
+        """
+        try:
+            async with aclosing(chunks):
+                async for audio_chunk in chunks:
+                    await self._queue.put(audio_chunk)
+            await self._queue.put(None)
+        except Exception as e:
+            await self._queue.put(e)
+
+    async def chunks(self) -> AsyncGenerator[bytes, None]:
+        """
+        Yield the audio chunks in order, waiting for those not yet synthesized.
+
+        Yields:
+            Individual audio chunks
+        """
+        try:
+            while (item := await self._queue.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self.cancel()
+
+    def cancel(self):
+        """
+        Stop synthesis if it is still running and release the handle.
+        
+        Called when the reader is done, so every handle is cancelled once.
+        """
+        self._task.cancel()
+        if not self._closed:
+            self._closed = True
+            for callback in self._callbacks:
+                callback()
+    
+    def add_done_callback(self, callback: Callable[[], None]):
+        """
+        Register a function to call once the handle has been read or cancelled.
+        
+        Args:
+            callback: Function taking no arguments
+        """
+        self._callbacks.append(callback)
+
+    async def wait_closed(self):
+        """
+        Wait for the background task to finish after cancel().
+        """
+        await asyncio.gather(self._task, return_exceptions=True)
+
 class TTSClient:
     """
     Client for communicating with a local TTS API.
@@ -33,7 +148,22 @@ class TTSClient:
         output_format: str = "wav",
         speed: float = 1.0,
         timeout: int = 60,
-        chunk_size: int = 4096
+        chunk_size: int = 4096,
+        max_concurrency: int = 3,
+        session=None,
+        sample_rate: int = 24000,
+        chunk_ms: int = 100,
+        cache_max_bytes: int = 50 * 1024 * 1024,
+        raw_pcm: bool = True,
+        initial_chunk_ms: int = 20,
+        ramp_chunks: int = 3,
+        cache_codec: str = "pcm",
+        cache_opus_bitrate: int = 24000,
+        cache_dir: Optional[str] = None,
+        cache_disk_max_bytes: int = 500 * 1024 * 1024,
+        optimize_streaming_latency: Optional[int] = None,
+        language: Optional[str] = None,
+        server_chunk_ms: Optional[int] = None
     ):
         """
         Initialize the TTS client.
@@ -46,6 +176,29 @@ class TTSClient:
             speed: Speech speed multiplier (0.25 to 4.0)
             timeout: Request timeout in seconds
             chunk_size: Size of audio chunks to stream in bytes
+            max_concurrency: Maximum number of concurrent async synthesis requests
+            session: Shared aiohttp.ClientSession for keep-alive connections
+                (a temporary session is created per request if omitted)
+            sample_rate: Sample rate of the 16-bit mono PCM returned by the API
+            chunk_ms: Duration of each streamed audio chunk in milliseconds
+            cache_max_bytes: Memory budget for cached synthesized audio (0 disables)
+            raw_pcm: Stream bare 16-bit PCM chunks instead of wrapping each
+                chunk in its own WAV header
+            initial_chunk_ms: Duration of the first streamed chunks, so playback
+                can start before a full chunk_ms of audio has been synthesized
+            ramp_chunks: Number of initial_chunk_ms chunks sent before switching
+                to chunk_ms (0 disables the ramp)
+            cache_codec: How streamed PCM is kept in the cache, "pcm" (exact) or
+                "opus" (lossy, roughly 20x smaller; requires opuslib)
+            cache_opus_bitrate: Opus bitrate in bits per second for cached audio
+            cache_dir: Directory where cached audio is also persisted, so it
+                survives restarts (None keeps the cache in memory only)
+            cache_disk_max_bytes: Disk budget for persisted audio
+            optimize_streaming_latency: Server latency/quality trade-off, 0 (best
+                quality) to 4 (lowest latency), as in ElevenLabs' parameter
+            language: Language code sent to the server so it can skip detection
+            server_chunk_ms: Preferred duration of the chunks the server streams
+                back (sent as stream_chunk_size)
         """
         self.api_endpoint = api_endpoint
         self.model = model
@@ -54,14 +207,386 @@ class TTSClient:
         self.speed = speed
         self.timeout = timeout
         self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+        self.session = session
+        self._owned_session = None
+        self.sample_rate = sample_rate
+        self.chunk_ms = chunk_ms
+        self.raw_pcm = raw_pcm
+        self.initial_chunk_ms = initial_chunk_ms
+        self.ramp_chunks = ramp_chunks
+        self.optimize_streaming_latency = optimize_streaming_latency
+        self.language = language
+        self.server_chunk_ms = server_chunk_ms
+        
+        # Optional streaming hints, only sent when configured since not every
+        # OpenAI-compatible server accepts fields beyond the standard ones
+        self._payload_extras = {
+            name: value for name, value in (
+                ("optimize_streaming_latency", optimize_streaming_latency),
+                ("language", language),
+                ("stream_chunk_size", server_chunk_ms)
+            ) if value is not None
+        }
+        
+        # Serialized request fields, ending where the input text is appended
+        payload = {
+            "model": model,
+            "voice": voice,
+            "response_format": output_format,
+            "speed": speed,
+            **self._payload_extras
+        }
+        self._payload_prefix = orjson.dumps(payload)[:-1] + b',"input":'
+        self._request_headers = {"Content-Type": "application/json"}
+        
+        # Format of the chunks yielded by stream_text_to_speech_async
+        self.stream_format = "pcm_s16le" if raw_pcm else "wav"
+        
+        # Pooled connections for the synchronous methods, so repeated calls
+        # reuse keep-alive connections instead of reconnecting every time
+        self._sync_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self._sync_session.mount("http://", adapter)
+        self._sync_session.mount("https://", adapter)
+        
+        # Bytes of 16-bit mono PCM per streamed chunk, e.g. 4800 for 100ms at 24kHz
+        self.chunk_bytes = max(1, sample_rate * chunk_ms // 1000) * 2
+        self.initial_chunk_bytes = min(self.chunk_bytes, max(1, sample_rate * initial_chunk_ms // 1000) * 2)
+        
+        # 44-byte header for 16-bit mono PCM at sample_rate, with the RIFF and
+        # data sizes left at zero to be filled in per chunk
+        self._wav_header = (
+            b"RIFF" + bytes(4) + b"WAVE"
+            + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+            + b"data" + bytes(4)
+        )
         
-        # State tracking
-        self.is_processing = False
+        # Limits in-flight requests shared by all connections using this client
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        
+        # Gauges: requests waiting for a slot, and requests holding one
+        self.queue_depth = 0
+        self.in_flight = 0
+        
+        # LRU cache of synthesized audio, bounded by total bytes rather than
+        # entry count since utterance lengths vary widely
+        self.cache_max_bytes = cache_max_bytes
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # Opus only applies to raw PCM streams at a rate it supports
+        if cache_codec == "opus" and (opuslib is None or not raw_pcm or sample_rate not in OPUS_SAMPLE_RATES):
+            logger.warning("Opus cache compression unavailable (needs opuslib, raw PCM and a "
+                           "supported sample rate); caching uncompressed PCM")
+            cache_codec = "pcm"
+        self.cache_codec = cache_codec
+        self.cache_opus_bitrate = cache_opus_bitrate
+        self._opus_frame_samples = sample_rate * OPUS_FRAME_MS // 1000
+        self.cache_bytes_saved = 0
+        
+        # Optional second tier on disk, used by the async paths
+        self.disk_cache = None
+        if cache_dir and cache_max_bytes:
+            self.disk_cache = AudioDiskCache(cache_dir, cache_disk_max_bytes)
+        self.cache_disk_hits = 0
+        
+        # State tracking. Requests from every connection share the client and
+        # sentences are prefetched, so several can be in progress at once.
+        self.active_requests = 0
         self.last_processing_time = 0
         
         logger.info(f"Initialized TTS Client with endpoint={api_endpoint}, "
                    f"model={model}, voice={voice}")
     
+    @property
+    def is_processing(self) -> bool:
+        """
+        Whether any synthesis request is in progress.
+        """
+        return self.active_requests > 0
+    
+    async def _get_session(self):
+        """
+        Get the shared HTTP session, or the client's own keep-alive session if
+        none was provided (created on first use, since it needs a running loop).
+        """
+        if self.session is not None:
+            return self.session
+        
+        if self._owned_session is None or self._owned_session.closed:
+            self._owned_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=8,
+                    ttl_dns_cache=300,
+                    enable_cleanup_closed=True
+                )
+            )
+        return self._owned_session
+    
+    @asynccontextmanager
+    async def _request_slot(self):
+        """
+        Hold one of the max_concurrency request slots, tracking how many
+        requests are queued behind the limit.
+        """
+        self.queue_depth += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+        
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+    
+    def _build_request_body(self, text: str) -> bytes:
+        """
+        Build the JSON request body for the TTS API.
+        
+        Only the input text is serialized per call; the other fields come from
+        the prefix prepared in __init__.
+        
+        Args:
+            text: Text to convert to speech
+            
+        Returns:
+            JSON request body
+        """
+        return b"".join((self._payload_prefix, orjson.dumps(text), b"}"))
+    
+    def _cache_key(self, text: str, streamed: bool) -> bytes:
+        """
+        Build a cache key for the given text and the current voice settings.
+        
+        Args:
+            text: Text to convert to speech
+            streamed: Whether the entry holds streamed chunks or a whole file
+            
+        Returns:
+            SHA-256 digest identifying the synthesized audio
+        """
+        # Case is kept since it can change pronunciation (e.g. "US" vs "us")
+        normalized = " ".join(unicodedata.normalize("NFKC", text).split())
+        key = "\x1f".join((
+            normalized, self.voice, self.model, repr(self.speed),
+            self.output_format, str(self.sample_rate), str(self.chunk_bytes), self.cache_codec,
+            f"{self.initial_chunk_bytes}x{self.ramp_chunks}",
+            repr(self._payload_extras),
+            self.stream_format if streamed else "full"
+        ))
+        return hashlib.sha256(key.encode("utf-8")).digest()
+    
+    def _cache_get(self, key: bytes) -> Optional[Union[bytes, Tuple[bytes, ...], EncodedAudio]]:
+        """
+        Look up cached audio, marking it as most recently used.
+        
+        Args:
+            key: Cache key from _cache_key
+            
+        Returns:
+            Cached audio, or None on a miss
+        """
+        if not self.cache_max_bytes:
+            return None
+        
+        entry = self._cache.get(key)
+        if entry is None:
+            self.cache_misses += 1
+            return None
+        
+        self._cache.move_to_end(key)
+        self.cache_hits += 1
+        return entry[0]
+    
+    def _cache_put(self, key: bytes, audio: Union[bytes, Tuple[bytes, ...], EncodedAudio]) -> None:
+        """
+        Store synthesized audio, evicting least recently used entries to stay
+        within the byte budget.
+        
+        Args:
+            key: Cache key from _cache_key
+            audio: Whole audio file, the streamed chunks in order, or their
+                Opus encoding
+        """
+        if isinstance(audio, bytes):
+            size = len(audio)
+        elif isinstance(audio, EncodedAudio):
+            size = sum(len(packet) for packet in audio.packets)
+        else:
+            size = sum(len(chunk) for chunk in audio)
+        if not size or size > self.cache_max_bytes:
+            return
+        
+        if isinstance(audio, EncodedAudio):
+            self.cache_bytes_saved += audio.pcm_length - size
+        
+        previous = self._cache.pop(key, None)
+        if previous is not None:
+            self._cache_bytes -= previous[1]
+        
+        self._cache[key] = (audio, size)
+        self._cache_bytes += size
+        
+        while self._cache_bytes > self.cache_max_bytes:
+            _, (_, evicted_size) = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted_size
+    
+    @staticmethod
+    def _serialize_entry(audio: Union[bytes, Tuple[bytes, ...], EncodedAudio]) -> bytes:
+        """
+        Serialize a cache entry for the disk cache.
+        
+        The layout is a header (kind, PCM length for Opus entries, part
+        count), the length of each part, then the parts themselves.
+        
+        Args:
+            audio: Cache entry
+            
+        Returns:
+            Serialized entry
+        """
+        if isinstance(audio, bytes):
+            kind, pcm_length, parts = ENTRY_FILE, 0, (audio,)
+        elif isinstance(audio, EncodedAudio):
+            kind, pcm_length, parts = ENTRY_OPUS, audio.pcm_length, audio.packets
+        else:
+            kind, pcm_length, parts = ENTRY_CHUNKS, 0, audio
+        
+        header = ENTRY_HEADER.pack(kind, pcm_length, len(parts))
+        lengths = struct.pack(f"<{len(parts)}I", *(len(part) for part in parts))
+        return b"".join((header, lengths, *parts))
+    
+    @staticmethod
+    def _deserialize_entry(data: bytes) -> Union[bytes, Tuple[bytes, ...], EncodedAudio]:
+        """
+        Rebuild a cache entry read from the disk cache.
+        
+        Args:
+            data: Serialized entry
+            
+        Returns:
+            Cache entry
+            
+        Raises:
+            ValueError: If the data is truncated or malformed
+        """
+        try:
+            kind, pcm_length, count = ENTRY_HEADER.unpack_from(data)
+            lengths = struct.unpack_from(f"<{count}I", data, ENTRY_HEADER.size)
+        except struct.error as e:
+            raise ValueError(f"Malformed cache entry: {e}")
+        
+        offset = ENTRY_HEADER.size + 4 * count
+        parts = []
+        for length in lengths:
+            parts.append(data[offset:offset + length])
+            offset += length
+        if offset != len(data):
+            raise ValueError("Truncated cache entry")
+        
+        if kind == ENTRY_FILE and count == 1:
+            return parts[0]
+        if kind == ENTRY_CHUNKS:
+            return tuple(parts)
+        if kind == ENTRY_OPUS:
+            return EncodedAudio(tuple(parts), pcm_length)
+        raise ValueError(f"Unknown cache entry kind: {kind}")
+    
+    async def _cache_lookup(self, key: bytes) -> Optional[Union[bytes, Tuple[bytes, ...], EncodedAudio]]:
+        """
+        Look up cached audio in memory, then on disk.
+        
+        Args:
+            key: Cache key from _cache_key
+            
+        Returns:
+            Cached audio, or None on a miss
+        """
+        audio = self._cache_get(key)
+        if audio is not None or self.disk_cache is None:
+            return audio
+        
+        data = await self.disk_cache.load(key)
+        if data is None:
+            return None
+        
+        try:
+            audio = self._deserialize_entry(data)
+        except ValueError as e:
+            logger.error(f"Discarding unreadable TTS cache file: {e}")
+            return None
+        
+        self.cache_disk_hits += 1
+        self._cache_put(key, audio)
+        return audio
+    
+    def _cache_store(self, key: bytes, audio: Union[bytes, Tuple[bytes, ...], EncodedAudio]) -> None:
+        """
+        Store audio in memory and queue it for the disk cache.
+        
+        Args:
+            key: Cache key from _cache_key
+            audio: Cache entry
+        """
+        self._cache_put(key, audio)
+        if self.disk_cache is not None:
+            self.disk_cache.store(key, self._serialize_entry(audio))
+    
+    def _encode_opus(self, pcm: bytes) -> EncodedAudio:
+        """
+        Compress 16-bit mono PCM for the cache.
+        
+        Args:
+            pcm: Raw PCM audio data
+            
+        Returns:
+            EncodedAudio: One Opus packet per OPUS_FRAME_MS frame
+        """
+        encoder = opuslib.Encoder(self.sample_rate, 1, opuslib.APPLICATION_VOIP)
+        encoder.bitrate = self.cache_opus_bitrate
+        
+        # The last frame is padded with silence and trimmed again on decode
+        frame_bytes = self._opus_frame_samples * 2
+        padded = pcm + bytes(-len(pcm) % frame_bytes)
+        packets = tuple(
+            encoder.encode(padded[offset:offset + frame_bytes], self._opus_frame_samples)
+            for offset in range(0, len(padded), frame_bytes)
+        )
+        return EncodedAudio(packets, len(pcm))
+    
+    def _decode_opus(self, audio: EncodedAudio) -> Generator[bytes, None, None]:
+        """
+        Decode cached Opus audio back into streamable PCM chunks.
+        
+        Args:
+            audio: Cached Opus packets
+            
+        Yields:
+            Raw 16-bit PCM chunks, sized like a live stream
+        """
+        decoder = opuslib.Decoder(self.sample_rate, 1)
+        remaining = audio.pcm_length
+        pending = bytearray()
+        chunk_index = 0
+        
+        for packet in audio.packets:
+            pcm = decoder.decode(packet, self._opus_frame_samples)[:remaining]
+            remaining -= len(pcm)
+            pending += pcm
+            if len(pending) >= self._chunk_target(chunk_index):
+                yield bytes(pending)
+                pending.clear()
+                chunk_index += 1
+        
+        if pending:
+            yield bytes(pending)
+    
     def text_to_speech(self, text: str) -> bytes:
         """
         Convert text to speech audio.
@@ -72,25 +597,26 @@ class TTSClient:
         Returns:
             Audio data as bytes
         """
-        self.is_processing = True
+        cache_key = self._cache_key(text, streamed=False)
+        cached_audio = self._cache_get(cache_key)
+        if cached_audio is not None:
+            logger.info(f"Using cached TTS audio for {len(text)} characters of text")
+            return cached_audio
+        
+        self.active_requests += 1
         start_time = time.time()
         
         try:
-            # Prepare request payload
-            payload = {
-                "model": self.model,
-                "input": text,
-                "voice": self.voice,
-                "response_format": self.output_format,
-                "speed": self.speed
-            }
+            # Prepare request body
+            body = self._build_request_body(text)
             
             logger.info(f"Sending TTS request with {len(text)} characters of text")
             
             # Send request to TTS API
-            response = requests.post(
+            response = self._sync_session.post(
                 self.api_endpoint,
-                json=payload,
+                data=body,
+                headers=self._request_headers,
                 timeout=self.timeout
             )
             
@@ -106,6 +632,7 @@ class TTSClient:
             logger.info(f"Received TTS response after {self.last_processing_time:.2f}s, "
                        f"size: {len(audio_data)} bytes")
             
+            self._cache_put(cache_key, audio_data)
             return audio_data
             
         except requests.RequestException as e:
@@ -115,7 +642,7 @@ class TTSClient:
             logger.error(f"TTS processing error: {e}")
             raise
         finally:
-            self.is_processing = False
+            self.active_requests -= 1
     
     def stream_text_to_speech(self, text: str) -> Generator[bytes, None, None]:
         """
@@ -127,25 +654,20 @@ class TTSClient:
         Yields:
             Chunks of audio data
         """
-        self.is_processing = True
+        self.active_requests += 1
         start_time = time.time()
         
         try:
-            # Prepare request payload
-            payload = {
-                "model": self.model,
-                "input": text,
-                "voice": self.voice,
-                "response_format": self.output_format,
-                "speed": self.speed
-            }
+            # Prepare request body
+            body = self._build_request_body(text)
             
             logger.info(f"Sending streaming TTS request with {len(text)} characters of text")
             
             # Send request to TTS API
-            with requests.post(
+            with self._sync_session.post(
                 self.api_endpoint,
-                json=payload,
+                data=body,
+                headers=self._request_headers,
                 timeout=self.timeout,
                 stream=True
             ) as response:
@@ -181,32 +703,55 @@ class TTSClient:
             logger.error(f"TTS streaming error: {e}")
             raise
         finally:
-            self.is_processing = False
+            self.active_requests -= 1
     
     async def async_text_to_speech(self, text: str) -> bytes:
         """
         Asynchronously generate audio data from the TTS API.
         
-        This method provides asynchronous TTS capability by running
-        the synchronous method in a thread.
-        
         Args:
             text: Text to convert to speech
             
         Returns:
             Complete audio data as bytes
         """
-        self.is_processing = True
+        cache_key = self._cache_key(text, streamed=False)
+        cached_audio = await self._cache_lookup(cache_key)
+        if cached_audio is not None:
+            logger.info(f"Using cached TTS audio for {len(text)} characters of text")
+            return cached_audio
+        
+        self.active_requests += 1
+        start_time = time.time()
         
         try:
-            # Get complete audio data
-            audio_data = await asyncio.to_thread(self.text_to_speech, text)
+            # Prepare request body
+            body = self._build_request_body(text)
+            
+            logger.info(f"Sending async TTS request with {len(text)} characters of text")
+            
+            async with self._request_slot():
+                session = await self._get_session()
+                async with session.post(
+                    self.api_endpoint,
+                    data=body,
+                    headers=self._request_headers,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout)
+                ) as response:
+                    response.raise_for_status()
+                    audio_data = await response.read()
+        
+            self.last_processing_time = time.time() - start_time
+            logger.info(f"Received async TTS response after {self.last_processing_time:.2f}s, "
+                       f"size: {len(audio_data)} bytes")
+            
+            self._cache_store(cache_key, audio_data)
             return audio_data
         except Exception as e:
             logger.error(f"Async TTS error: {e}")
             raise
         finally:
-            self.is_processing = False
+            self.active_requests -= 1
     
     async def stream_text_to_speech_async(self, text: str):
         """
@@ -219,127 +764,286 @@ class TTSClient:
         Yields:
             Individual audio chunks as they are generated
         """
-        self.is_processing = True
+        cache_key = self._cache_key(text, streamed=True)
+        cached_chunks = await self._cache_lookup(cache_key)
+        if cached_chunks is not None:
+            logger.info(f"Using cached TTS audio for {len(text)} characters")
+            if isinstance(cached_chunks, EncodedAudio):
+                # Decoding costs about as much as encoding, so it also runs in
+                # a worker thread
+                cached_chunks = await asyncio.to_thread(list, self._decode_opus(cached_chunks))
+            for audio_chunk in cached_chunks:
+                yield audio_chunk
+            return
+        
+        self.active_requests += 1
         start_time = time.time()
         chunk_count = 0
+        # Chunks are only cached once the whole utterance has streamed
+        streamed_chunks: Optional[List[bytes]] = [] if self.cache_max_bytes else None
         
         try:
-            # Prepare request payload
-            payload = {
-                "model": self.model,
-                "input": text,
-                "voice": self.voice,
-                "response_format": self.output_format,
-                "speed": self.speed
-            }
+            # Prepare request body
+            body = self._build_request_body(text)
             
             logger.info(f"Starting real-time TTS streaming for {len(text)} characters")
             
-            # Use asyncio-compatible HTTP client for true async streaming
-            import aiohttp
-            
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            async with self._request_slot():
+                session = await self._get_session()
                 async with session.post(
                     self.api_endpoint,
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
+                    data=body,
+                    headers=self._request_headers,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout)
                 ) as response:
                     response.raise_for_status()
                     
-                    wav_header_received = False
-                    accumulated_data = bytearray()
+                    # Raw PCM is passed through as it arrives; the client learns
+                    # the sample rate from the tts_start message instead of a
+                    # header on every chunk
+                    if self.raw_pcm:
+                        audio_chunks = self._passthrough_pcm(response.content)
+                    else:
+                        audio_chunks = self._rechunk_as_wav(response.content)
                     
-                    # Stream raw chunks and reconstruct individual audio segments
-                    async for raw_chunk in response.content.iter_chunked(self.chunk_size):
-                        if not raw_chunk:
-                            continue
-                            
-                        accumulated_data.extend(raw_chunk)
-                        
-                        # Skip WAV header on first chunk
-                        if not wav_header_received and len(accumulated_data) >= 44:
-                            # Remove WAV header (first 44 bytes)
-                            accumulated_data = accumulated_data[44:]
-                            wav_header_received = True
-                            logger.info("WAV header processed, starting audio chunk streaming")
-                        
-                        # Process audio data in meaningful chunks (e.g., 0.1 seconds of audio)
-                        # At 24kHz, 16-bit mono: 0.1s = 2400 samples = 4800 bytes
-                        chunk_size_bytes = 4800  # ~0.1 seconds of audio
-                        
-                        while len(accumulated_data) >= chunk_size_bytes:
-                            # Extract one chunk
-                            audio_chunk_data = accumulated_data[:chunk_size_bytes]
-                            accumulated_data = accumulated_data[chunk_size_bytes:]
-                            
-                            # Create a complete WAV file for this chunk
-                            wav_chunk = self._create_wav_chunk(audio_chunk_data)
+                    async with aclosing(audio_chunks):
+                        async for audio_chunk in audio_chunks:
                             chunk_count += 1
                             
-                            logger.info(f"Yielding audio chunk {chunk_count} ({len(wav_chunk)} bytes)")
-                            yield wav_chunk
-                    
-                    # Process any remaining data
-                    if len(accumulated_data) > 0:
-                        wav_chunk = self._create_wav_chunk(accumulated_data)
-                        chunk_count += 1
-                        logger.info(f"Yielding final audio chunk {chunk_count} ({len(wav_chunk)} bytes)")
-                        yield wav_chunk
+                            logger.info(f"Yielding audio chunk {chunk_count} ({len(audio_chunk)} bytes)")
+                            if streamed_chunks is not None:
+                                streamed_chunks.append(audio_chunk)
+                            yield audio_chunk
+            
+            if streamed_chunks:
+                if self.cache_codec == "opus":
+                    # Encoding takes a few milliseconds per second of speech
+                    encoded = await asyncio.to_thread(self._encode_opus, b"".join(streamed_chunks))
+                    self._cache_store(cache_key, encoded)
+                else:
+                    self._cache_store(cache_key, tuple(streamed_chunks))
             
             # Calculate processing time
             self.last_processing_time = time.time() - start_time
             logger.info(f"Completed real-time TTS streaming: {chunk_count} chunks in {self.last_processing_time:.2f}s")
-            
+        
         except Exception as e:
             logger.error(f"Real-time TTS streaming error: {e}")
             raise
         finally:
-            self.is_processing = False
+            self.active_requests -= 1
     
-    def _create_wav_chunk(self, pcm_data: bytes) -> bytes:
+    def _chunk_target(self, chunk_index: int) -> int:
         """
-        Create a complete WAV file from PCM data chunk.
+        Get the size of a streamed chunk, in bytes of PCM.
         
         Args:
-            pcm_data: Raw PCM audio data
+            chunk_index: Number of chunks already emitted for the utterance
             
         Returns:
-            Complete WAV file bytes
+            initial_chunk_bytes during the ramp, chunk_bytes afterwards
+        """
+        return self.initial_chunk_bytes if chunk_index < self.ramp_chunks else self.chunk_bytes
+    
+    async def _passthrough_pcm(self, content) -> AsyncGenerator[bytes, None]:
         """
-        import struct
+        Pass PCM from a streaming response through as it arrives.
         
-        # WAV header parameters
-        sample_rate = 24000  # Orpheus TTS sample rate
-        num_channels = 1     # Mono
-        bits_per_sample = 16
-        byte_rate = sample_rate * num_channels * bits_per_sample // 8
-        block_align = num_channels * bits_per_sample // 8
-        data_size = len(pcm_data)
+        Network reads are forwarded unchanged once the 44-byte WAV header has
+        been skipped. A read is only held back if it is shorter than the
+        current chunk size, to be merged with the next one, and a trailing
+        odd byte is carried over so every chunk holds whole samples.
         
-        # Create WAV header
-        header = bytearray(44)
+        Args:
+            content: aiohttp response body stream
+            
+        Yields:
+            Raw 16-bit PCM chunks
+        """
+        header_remaining = 44
+        pending = b""
+        chunk_index = 0
+        
+        async for data in content.iter_any():
+            if header_remaining:
+                skipped = min(header_remaining, len(data))
+                header_remaining -= skipped
+                data = data[skipped:]
+            
+            if pending:
+                data = pending + data
+                pending = b""
+            
+            if len(data) < self._chunk_target(chunk_index):
+                pending = data
+                continue
+            
+            if len(data) % 2:
+                pending = data[-1:]
+                data = data[:-1]
+            
+            chunk_index += 1
+            yield data
+        
+        # Flush any remaining whole samples
+        pending = pending[:len(pending) - len(pending) % 2]
+        if pending:
+            yield pending
+    
+    async def _rechunk_as_wav(self, content) -> AsyncGenerator[bytes, None]:
+        """
+        Cut a streaming response into fixed-duration WAV files.
+        
+        Args:
+            content: aiohttp response body stream
+            
+        Yields:
+            Complete WAV files, each playable on its own
+        """
+        wav_header_received = False
+        accumulated_data = bytearray()
+        chunk_index = 0
+        
+        # Stream raw chunks and reconstruct individual audio segments
+        async for raw_chunk in content.iter_chunked(self.chunk_size):
+            if not raw_chunk:
+                continue
+            
+            accumulated_data.extend(raw_chunk)
+            
+            # Skip WAV header on first chunk
+            if not wav_header_received:
+                if len(accumulated_data) < 44:
+                    continue
+                # Remove WAV header (first 44 bytes)
+                del accumulated_data[:44]
+                wav_header_received = True
+                logger.info("WAV header processed, starting audio chunk streaming")
+            
+            # Emit fixed-duration chunks so playback can start on the first
+            # one while synthesis continues. Every whole chunk is built
+            # straight from views of the buffer (the PCM is copied once, into
+            # the WAV bytes), then dropped from the front of the buffer in one
+            # deletion (bytearray trims its head in place, so the tail is not
+            # copied per chunk)
+            wav_chunks = []
+            consumed = 0
+            with memoryview(accumulated_data) as view:
+                while len(view) - consumed >= (chunk_size_bytes := self._chunk_target(chunk_index)):
+                    wav_chunks.append(self._create_wav_chunk(view[consumed:consumed + chunk_size_bytes]))
+                    consumed += chunk_size_bytes
+                    chunk_index += 1
+            del accumulated_data[:consumed]
+            
+            for wav_chunk in wav_chunks:
+                yield wav_chunk
+        
+        # Process any remaining whole samples
+        if len(accumulated_data) % 2:
+            del accumulated_data[-1]
+        if len(accumulated_data) > 0:
+            yield self._create_wav_chunk(accumulated_data)
+    
+    async def stream_parallel(self, text: str):
+        """
+        Stream audio for multi-sentence text, synthesizing one sentence ahead.
+        
+        The next sentence is requested while the current one streams, and the
+        chunks are yielded strictly in sentence order, so each sentence is
+        ready by the time the previous one has played.
+        
+        Args:
+            text: Text to convert to speech
+            
+        Yields:
+            Individual audio chunks, in playback order
+        """
+        sentences = [sentence for sentence in SENTENCE_SPLIT_PATTERN.split(text.strip()) if sentence]
+        if len(sentences) <= 1:
+            async with aclosing(self.stream_text_to_speech_async(text)) as chunks:
+                async for audio_chunk in chunks:
+                    yield audio_chunk
+            return
+        
+        # Only the next sentence is synthesized ahead of the one being read,
+        # so a long response holds at most two request slots
+        stream = PrefetchedSpeech(sentences[0], self.stream_text_to_speech_async(sentences[0]))
+        next_stream = None
         
-        # RIFF header
-        header[0:4] = b'RIFF'
+        try:
+            for next_sentence in sentences[1:] + [None]:
+                if next_sentence is not None:
+                    next_stream = PrefetchedSpeech(
+                        next_sentence, self.stream_text_to_speech_async(next_sentence))
+                
+                async with aclosing(stream.chunks()) as chunks:
+                    async for audio_chunk in chunks:
+                        yield audio_chunk
+                
+                stream, next_stream = next_stream, None
+        finally:
+            streams = [pending for pending in (stream, next_stream) if pending is not None]
+            for pending in streams:
+                pending.cancel()
+            await asyncio.gather(*(pending.wait_closed() for pending in streams))
+    
+    def prefetch(self, text: str) -> PrefetchedSpeech:
+        """
+        Start synthesizing text now and buffer the audio until it is read.
+        
+        Used by the voice pipeline to request the next sentence while the
+        current one is still streaming, hiding the synthesis latency between
+        sentences. The caller must read or cancel the returned handle.
+        
+        Args:
+            text: Text to convert to speech
+            
+        Returns:
+            PrefetchedSpeech: Handle yielding the audio chunks in order
+        """
+        return PrefetchedSpeech(text, self.stream_parallel(text))
+    
+    def _create_wav_chunk(self, pcm_data: Union[bytes, bytearray, memoryview]) -> bytes:
+        """
+        Create a complete WAV file from PCM data chunk.
+        
+        Args:
+            pcm_data: Raw PCM audio data (any bytes-like object; a byte
+                memoryview avoids copying it out of the stream buffer first)
+            
+        Returns:
+            Complete WAV file bytes
+        """
+        # Only the two size fields differ between chunks
+        header = bytearray(self._wav_header)
+        data_size = len(pcm_data)
         struct.pack_into('<I', header, 4, 36 + data_size)  # File size
-        header[8:12] = b'WAVE'
-        
-        # fmt subchunk
-        header[12:16] = b'fmt '
-        struct.pack_into('<I', header, 16, 16)  # Subchunk1Size
-        struct.pack_into('<H', header, 20, 1)   # AudioFormat (PCM)
-        struct.pack_into('<H', header, 22, num_channels)  # NumChannels
-        struct.pack_into('<I', header, 24, sample_rate)   # SampleRate
-        struct.pack_into('<I', header, 28, byte_rate)     # ByteRate
-        struct.pack_into('<H', header, 32, block_align)   # BlockAlign
-        struct.pack_into('<H', header, 34, bits_per_sample)  # BitsPerSample
-        
-        # data subchunk
-        header[36:40] = b'data'
-        struct.pack_into('<I', header, 40, data_size)  # Subchunk2Size
+        struct.pack_into('<I', header, 40, data_size)      # Subchunk2Size
         
         # Combine header and data
-        return bytes(header) + pcm_data
+        return b"".join((header, pcm_data))
+    
+    def start(self):
+        """
+        Start background work (the disk cache writer). Must be called from the
+        running event loop.
+        """
+        if self.disk_cache is not None:
+            self.disk_cache.start()
+    
+    async def close(self):
+        """
+        Release pooled connections and stop background work.
+        
+        A shared session passed to the constructor is left open for its owner
+        to close.
+        """
+        if self.disk_cache is not None:
+            await self.disk_cache.close()
+        self._sync_session.close()
+        if self._owned_session is not None:
+            await self._owned_session.close()
+            self._owned_session = None
     
     def get_config(self) -> Dict[str, Any]:
         """
@@ -356,6 +1060,27 @@ class TTSClient:
             "speed": self.speed,
             "timeout": self.timeout,
             "chunk_size": self.chunk_size,
+            "sample_rate": self.sample_rate,
+            "chunk_ms": self.chunk_ms,
+            "initial_chunk_ms": self.initial_chunk_ms,
+            "ramp_chunks": self.ramp_chunks,
+            "optimize_streaming_latency": self.optimize_streaming_latency,
+            "language": self.language,
+            "server_chunk_ms": self.server_chunk_ms,
+            "stream_format": self.stream_format,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "cache_max_bytes": self.cache_max_bytes,
+            "cache_bytes": self._cache_bytes,
+            "cache_entries": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_codec": self.cache_codec,
+            "cache_bytes_saved": self.cache_bytes_saved,
+            "cache_disk_hits": self.cache_disk_hits,
+            "disk_cache": self.disk_cache.get_config() if self.disk_cache else None,
             "is_processing": self.is_processing,
+            "active_requests": self.active_requests,
             "last_processing_time": self.last_processing_time
         }
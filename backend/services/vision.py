@@ -76,7 +76,7 @@ class VisionService:
             
         try:
             # Decode base64 image
-            import base64
+            import binascii
             from io import BytesIO
             from PIL import Image
             import torch
@@ -89,7 +89,7 @@ class VisionService:
             formatted_prompt = f"User uploaded this image: <image>\n{prompt}"
             
             # Convert base64 to image
-            image_data = base64.b64decode(image_base64)
+            image_data = binascii.a2b_base64(image_base64)
             image = Image.open(BytesIO(image_data)).convert('RGB')
             
             # Prepare inputs for the model with the correct token format
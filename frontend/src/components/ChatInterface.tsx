@@ -345,10 +345,17 @@ const ChatInterface: React.FC = () => {
         console.log("Empty transcript received, returning to idle");
         setAssistantState('idle');
       } else {
+        // Clear the previous response so streamed tokens start fresh
+        setResponse('');
         setAssistantState('processing');
       }
     };
     
+    // Handle streamed LLM tokens for progressive rendering
+    const handleLLMToken = (data: any) => {
+      setResponse(prev => prev + data.text);
+    };
+    
     // Handle LLM response
     const handleLLMResponse = (data: any) => {
       // Store the response text
@@ -409,6 +416,7 @@ const ChatInterface: React.FC = () => {
     websocketService.addEventListener('error', handleConnectionChange);
     websocketService.addEventListener('transcription', handleTranscription);
     websocketService.addEventListener('llm_response', handleLLMResponse);
+    websocketService.addEventListener('llm_token', handleLLMToken);
     // Add error handler for non-connection errors
     websocketService.addEventListener('error', handleError);
     
@@ -439,8 +447,8 @@ const ChatInterface: React.FC = () => {
     // Handle TTS audio chunks
     const handleTTSChunk = (data: any) => {
       if (data.audio_chunk) {
-        console.log(`Received TTS chunk (${data.audio_chunk.length} chars), sending to audio service`);
-        audioService.playAudioChunk(data.audio_chunk, data.format || 'mp3');
+        console.log(`Received TTS chunk (${data.audio_chunk.byteLength ?? data.audio_chunk.length} bytes), sending to audio service`);
+        audioService.playAudioChunk(data.audio_chunk, data.format || 'mp3', data.sample_rate);
       }
     };
     
@@ -456,6 +464,7 @@ const ChatInterface: React.FC = () => {
       websocketService.removeEventListener('error', handleConnectionChange);
       websocketService.removeEventListener('transcription', handleTranscription);
       websocketService.removeEventListener('llm_response', handleLLMResponse);
+      websocketService.removeEventListener('llm_token', handleLLMToken);
       websocketService.removeEventListener('error', handleError);
       websocketService.removeEventListener('tts_chunk', handleTTSChunk);
       
@@ -4,7 +4,7 @@
  * Handles audio recording, processing, and playback
  */
 
-import websocketService, { WebSocketService, MessageType } from './websocket';
+import websocketService, { MessageType } from './websocket';
 
 // Audio configuration
 interface AudioConfig {
@@ -537,12 +537,13 @@ private applyLowPassFilter(
   }
 
   /**
-   * Play audio from base64-encoded data with immediate streaming playback
+   * Play audio from binary data with immediate streaming playback
    * 
    * This method now handles individual audio chunks for real-time streaming.
-   * Each chunk is played immediately as it arrives.
+   * Each chunk is played immediately as it arrives. Raw 'pcm_s16le' chunks
+   * are converted directly; other formats go through decodeAudioData.
    */
-  public async playAudioChunk(base64AudioChunk: string, format: string = 'wav'): Promise<void> {
+  public async playAudioChunk(audioData: ArrayBuffer, format: string = 'wav', sampleRate: number = 24000): Promise<void> {
     try {
       await this.initAudioContext();
       
@@ -550,15 +551,13 @@ private applyLowPassFilter(
         throw new Error('AudioContext not initialized');
       }
       
-      // Convert base64 to ArrayBuffer
-      const audioData = WebSocketService.base64ToArrayBuffer(base64AudioChunk);
-
-      
       console.log(`Received audio chunk (${audioData.byteLength} bytes) - processing immediately`);
       
       // Decode the audio data immediately
       try {
-        const audioBuffer = await this.audioContext.decodeAudioData(audioData);
+        const audioBuffer = format === 'pcm_s16le'
+          ? this.pcm16ToAudioBuffer(audioData, sampleRate)
+          : await this.audioContext.decodeAudioData(audioData);
         
         console.log(`Decoded audio chunk: duration=${audioBuffer.duration.toFixed(3)}s`);
         
@@ -583,6 +582,26 @@ private applyLowPassFilter(
     }
   }
   
+  /**
+   * Convert raw 16-bit little-endian mono PCM to an AudioBuffer
+   */
+  private pcm16ToAudioBuffer(audioData: ArrayBuffer, sampleRate: number): AudioBuffer {
+    if (!this.audioContext) {
+      throw new Error('AudioContext not initialized');
+    }
+    
+    const view = new DataView(audioData);
+    const sampleCount = Math.floor(audioData.byteLength / 2);
+    const audioBuffer = this.audioContext.createBuffer(1, sampleCount, sampleRate);
+    const channel = audioBuffer.getChannelData(0);
+    
+    for (let i = 0; i < sampleCount; i++) {
+      channel[i] = view.getInt16(i * 2, true) / 32768;
+    }
+    
+    return audioBuffer;
+  }
+  
   /**
    * Play next audio chunk from the queue with optimized real-time streaming
    */
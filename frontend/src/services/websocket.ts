@@ -9,6 +9,7 @@ export enum MessageType {
   AUDIO = "audio",
   TRANSCRIPTION = "transcription",
   LLM_RESPONSE = "llm_response",
+  LLM_TOKEN = "llm_token",
   TTS_CHUNK = "tts_chunk",
   TTS_START = "tts_start",
   TTS_END = "tts_end",
@@ -46,6 +47,16 @@ export enum MessageType {
   VISION_READY = "vision_ready"
 }
 
+// Binary frame types (corresponds to backend FrameType)
+// Audio is sent as binary frames: 1-byte type tag, 3 reserved bytes, payload
+export enum FrameType {
+  TRANSCRIPT = 0,
+  LLM_TEXT = 1,
+  AUDIO = 2
+}
+
+const FRAME_HEADER_SIZE = 4;
+
 // Session interface
 export interface Session {
   id: string;
@@ -69,6 +80,7 @@ type WebSocketEventType =
   | 'audio'
   | 'transcription'
   | 'llm_response'
+  | 'llm_token'
   | 'tts_start'
   | 'tts_chunk'
   | 'tts_end'
@@ -116,6 +128,10 @@ export class WebSocketService {
   private pingInterval: number | null = null;
   private connectionState: ConnectionState = ConnectionState.DISCONNECTED;
   
+  // Format of the TTS audio frames, announced by the tts_start message
+  private ttsFormat: string = 'wav';
+  private ttsSampleRate: number = 24000;
+  
   // Track states that should prevent interrupt signals
   private isInGreetingFlow: boolean = false;
 
@@ -170,6 +186,7 @@ export class WebSocketService {
     
     try {
       this.socket = new WebSocket(this.url);
+      this.socket.binaryType = 'arraybuffer';
       
       this.socket.onopen = this.onOpen.bind(this);
       this.socket.onclose = this.onClose.bind(this);
@@ -225,26 +242,30 @@ export class WebSocketService {
   }
 
   /**
-   * Send audio data to the WebSocket server
+   * Send audio data to the WebSocket server as a binary frame
    */
   public sendAudio(audioData: Float32Array | ArrayBuffer): boolean {
-    // Convert to base64 if Float32Array
-    let base64Data: string;
+    if (!this.socket || this.socket.readyState !== WebSocket.OPEN) {
+      console.error('WebSocket not connected');
+      return false;
+    }
     
-    if (audioData instanceof Float32Array) {
-      // Create a buffer from the Float32Array
-      const buffer = new ArrayBuffer(audioData.length * 4); // 4 bytes per float
-      const view = new Float32Array(buffer);
-      view.set(audioData);
+    try {
+      const payload = audioData instanceof Float32Array
+        ? new Uint8Array(audioData.buffer, audioData.byteOffset, audioData.byteLength)
+        : new Uint8Array(audioData);
       
-      base64Data = this.arrayBufferToBase64(buffer);
-    } else {
-      base64Data = this.arrayBufferToBase64(audioData);
+      // Prefix the payload with the frame header
+      const frame = new Uint8Array(FRAME_HEADER_SIZE + payload.byteLength);
+      frame[0] = FrameType.AUDIO;
+      frame.set(payload, FRAME_HEADER_SIZE);
+      
+      this.socket.send(frame.buffer);
+      return true;
+    } catch (error) {
+      console.error('Error sending audio:', error);
+      return false;
     }
-    
-    return this.send(MessageType.AUDIO, {
-      audio_data: base64Data
-    });
   }
 
   /**
@@ -496,6 +517,12 @@ export class WebSocketService {
    * Handle WebSocket message event
    */
   private onMessage(event: MessageEvent): void {
+    // Binary frames carry audio
+    if (event.data instanceof ArrayBuffer) {
+      this.onBinaryFrame(event.data);
+      return;
+    }
+    
     try {
       const message = JSON.parse(event.data);
       const type = message.type as WebSocketEventType;
@@ -514,6 +541,14 @@ export class WebSocketService {
         return;
       }
       
+      // Remember the audio format for the binary frames that follow
+      if (message.type === MessageType.TTS_START && message.format) {
+        this.ttsFormat = message.format;
+        if (message.sample_rate) {
+          this.ttsSampleRate = message.sample_rate;
+        }
+      }
+      
       // Notify listeners
       this.notifyListeners(type, message);
     } catch (error) {
@@ -521,6 +556,29 @@ export class WebSocketService {
     }
   }
 
+  /**
+   * Handle a binary WebSocket frame
+   */
+  private onBinaryFrame(data: ArrayBuffer): void {
+    if (data.byteLength < FRAME_HEADER_SIZE) {
+      console.error('Received malformed binary frame');
+      return;
+    }
+    
+    const frameType = new Uint8Array(data, 0, 1)[0];
+    
+    if (frameType === FrameType.AUDIO) {
+      this.notifyListeners('tts_chunk', {
+        type: MessageType.TTS_CHUNK,
+        audio_chunk: data.slice(FRAME_HEADER_SIZE),
+        format: this.ttsFormat,
+        sample_rate: this.ttsSampleRate
+      });
+    } else {
+      console.warn(`Unknown binary frame type: ${frameType}`);
+    }
+  }
+
   /**
    * Notify all listeners of an event
    */
@@ -559,36 +617,6 @@ export class WebSocketService {
   private setConnectionState(state: ConnectionState): void {
     this.connectionState = state;
   }
-
-  /**
-   * Convert ArrayBuffer to Base64 string
-   */
-  private arrayBufferToBase64(buffer: ArrayBuffer): string {
-    const binary = [];
-    const bytes = new Uint8Array(buffer);
-    const len = bytes.byteLength;
-    
-    for (let i = 0; i < len; i++) {
-      binary.push(String.fromCharCode(bytes[i]));
-    }
-    
-    return btoa(binary.join(''));
-  }
-
-  /**
-   * Convert Base64 string to ArrayBuffer
-   */
-  public static base64ToArrayBuffer(base64: string): ArrayBuffer {
-    const binaryString = atob(base64);
-    const len = binaryString.length;
-    const bytes = new Uint8Array(len);
-    
-    for (let i = 0; i < len; i++) {
-      bytes[i] = binaryString.charCodeAt(i);
-    }
-    
-    return bytes.buffer;
-  }
 }
 
 // Create a singleton instance